@@ -1,3 +1,4 @@
 from .heuristics import detect_patterns, tag_nodes
+from .ranking import rank_nodes
 
-__all__ = ["detect_patterns", "tag_nodes"]
+__all__ = ["detect_patterns", "tag_nodes", "rank_nodes"]
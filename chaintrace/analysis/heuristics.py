@@ -1,9 +1,21 @@
-import networkx as nx
-from typing import Dict, List
+import numpy as np
+from typing import Dict, Iterable, List, Optional
+from ..graph.compact import CompactGraph
+from ..labels.index import LabelIndex
 
-def detect_patterns(G: nx.DiGraph) -> Dict[str, List[str]]:
+# Known-entity categories (from the label index) and their display colors
+CATEGORY_COLORS: Dict[str, str] = {
+    "exchange": "#33CC33",  # Green
+    "mixer": "#9933FF",     # Purple
+    "bridge": "#FFCC00",    # Yellow
+}
+DEFAULT_LABEL_COLOR = "#CCCCCC"  # Grey
+
+def detect_patterns(G: CompactGraph, nodes: Optional[Iterable[str]] = None) -> Dict[str, List[str]]:
     """
     Identify nodes matching specific structural patterns.
+    Only `nodes` are checked when given (incremental re-tagging); degrees are
+    kept up to date by the graph, so this costs O(len(nodes)).
     """
     patterns: Dict[str, List[str]] = {
         "fan_out": [],
@@ -11,41 +23,64 @@ def detect_patterns(G: nx.DiGraph) -> Dict[str, List[str]]:
         "bridge/mixer": []
     }
     
-    if len(G.nodes) == 0:
+    if G.number_of_nodes() == 0:
         return patterns
 
-    for node in G.nodes():
-        in_degree = G.in_degree(node)
-        out_degree = G.out_degree(node)
-        
-        # Heuristic: Fan Out (Dispenser/Exchange user withdrawal)
-        if out_degree > 5 and in_degree <= 2:
-            patterns["fan_out"].append(node)
-            
-        # Heuristic: Fan In (Collector/Exchange deposit address)
-        if in_degree > 5 and out_degree <= 2:
-            patterns["fan_in"].append(node)
-            
-        # Heuristic: High density pass-through (Bridge/Mixer)
-        if in_degree > 10 and out_degree > 10:
-            patterns["bridge/mixer"].append(node)
-            
+    ids = np.arange(G.number_of_nodes()) if nodes is None else np.array([G.index[n] for n in nodes], dtype=np.int64)
+    in_degree = G.in_degrees()[ids]
+    out_degree = G.out_degrees()[ids]
+
+    # Heuristic: Fan Out (Dispenser/Exchange user withdrawal)
+    fan_out = (out_degree > 5) & (in_degree <= 2)
+    # Heuristic: Fan In (Collector/Exchange deposit address)
+    fan_in = (in_degree > 5) & (out_degree <= 2)
+    # Heuristic: High density pass-through (Bridge/Mixer)
+    busy = (in_degree > 10) & (out_degree > 10)
+
+    patterns["fan_out"] = [G.nodes[i] for i in ids[fan_out]]
+    patterns["fan_in"] = [G.nodes[i] for i in ids[fan_in]]
+    patterns["bridge/mixer"] = [G.nodes[i] for i in ids[busy]]
     return patterns
 
-def tag_nodes(G: nx.DiGraph):
+def _set(G: CompactGraph, node: str, **attrs):
+    G.node_attrs.setdefault(G.index[node], {}).update(attrs)
+
+def tag_nodes(G: CompactGraph, labels: Optional[LabelIndex] = None, nodes: Optional[Iterable[str]] = None):
     """
     Apply risk tags to nodes in the graph.
+    Known entities from the label index override structural tags.
+    When `nodes` is given, only those nodes are re-tagged (stale tags cleared).
     """
-    patterns = detect_patterns(G)
+    if nodes is not None:
+        nodes = list(nodes)
+        for node in nodes:
+            attrs = G.node_attrs.get(G.index[node], {})
+            attrs.pop("tag", None)
+            attrs.pop("color", None)
+
+    patterns = detect_patterns(G, nodes)
     
     for node in patterns["fan_out"]:
-        G.nodes[node]["tag"] = "Dispenser"
-        G.nodes[node]["color"] = "#FF9900" # Orange
+        _set(G, node, tag="Dispenser", color="#FF9900")  # Orange
         
     for node in patterns["fan_in"]:
-        G.nodes[node]["tag"] = "Collector"
-        G.nodes[node]["color"] = "#00CCFF" # Blue
+        _set(G, node, tag="Collector", color="#00CCFF")  # Blue
         
     for node in patterns["bridge/mixer"]:
-        G.nodes[node]["tag"] = "High Activity"
-        G.nodes[node]["color"] = "#FF0000" # Red
+        _set(G, node, tag="High Activity", color="#FF0000")  # Red
+
+    if labels is None:
+        return
+
+    for node in (G.nodes if nodes is None else nodes):
+        label = labels.lookup(node)
+        if label is None:
+            continue
+        category = label["category"]
+        _set(
+            G, node,
+            label=label["name"],
+            category=category,
+            tag=category.title() if category else "Known Entity",
+            color=CATEGORY_COLORS.get(category, DEFAULT_LABEL_COLOR),
+        )
@@ -1,45 +1,66 @@
 import abc
 import hashlib
-import json
-import time
 from pathlib import Path
-from typing import List, Optional, Any
+from typing import Callable, List, Optional, Any, Set, TypeVar
 from ..models import Transaction
+from .cache import DiskCache, SingleFlight, DEFAULT_MAX_BYTES, DEFAULT_NEGATIVE_TTL
+
+T = TypeVar("T")
+
+# Shared by all collectors in the process so identical requests coalesce
+_inflight = SingleFlight()
 
 class BaseCollector(abc.ABC):
-    def __init__(self, chain: str, cache_dir: str = "data/raw/cache"):
+    def __init__(
+        self,
+        chain: str,
+        cache_dir: str = "data/raw/cache",
+        cache_max_bytes: int = DEFAULT_MAX_BYTES,
+        negative_ttl: int = DEFAULT_NEGATIVE_TTL,
+    ):
         self.chain = chain
         self.cache_dir = Path(cache_dir)
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
-    
-    def _get_cache_path(self, key: str) -> Path:
-        """Generate a safe cache file path from a key."""
+        self.cache = DiskCache(self.cache_dir, max_bytes=cache_max_bytes, negative_ttl=negative_ttl)
+        # Default freshness for cache reads; 0 forces every read to go upstream
+        self.cache_max_age = 86400
+        # Addresses whose fetch failed, so callers can tell a trace is incomplete
+        self.incomplete: Set[str] = set()
+
+    def _cache_name(self, key: str) -> str:
+        """Generate a safe cache entry name from a key."""
         hashed_key = hashlib.md5(key.encode()).hexdigest()
-        return self.cache_dir / f"{self.chain}_{hashed_key}.json"
-
-    def _read_cache(self, key: str, max_age_seconds: int = 86400) -> Optional[Any]:
-        """Read from cache if exists and is fresh."""
-        path = self._get_cache_path(key)
-        if not path.exists():
-            return None
-        
-        # Check specific modification time
-        mtime = path.stat().st_mtime
-        if time.time() - mtime > max_age_seconds:
-            return None
-            
-        try:
-            with open(path, 'r') as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return None
+        return f"{self.chain}_{hashed_key}"
+
+    def _read_cache(self, key: str, max_age_seconds: Optional[int] = None) -> Optional[Any]:
+        """Read from cache if exists and is fresh. Returns None on miss."""
+        if max_age_seconds is None:
+            max_age_seconds = self.cache_max_age
+        return self.cache.get(self._cache_name(key), max_age_seconds)
 
     def _write_cache(self, key: str, data: Any):
         """Write data to cache."""
-        path = self._get_cache_path(key)
-        with open(path, 'w') as f:
-            json.dump(data, f)
-            
+        self.cache.put(self._cache_name(key), data)
+
+    def _write_negative_cache(self, key: str, data: Any = None):
+        """Record an empty result; expires after the (short) negative TTL."""
+        self.cache.put(self._cache_name(key), [] if data is None else data, negative=True)
+
+    def _single_flight(self, key: str, fn: Callable[[], T]) -> T:
+        """Run fn once for concurrent callers sharing the same cache key."""
+        return _inflight.do(self._cache_name(key), fn)
+
+    def _fetch_through_cache(self, key: str, fetch: Callable[[], Optional[Any]]) -> Optional[Any]:
+        """
+        Single-flight fetch for a cache miss. The flight re-reads the cache first,
+        so a caller that missed just as a previous leader finished reuses its
+        result instead of going upstream again.
+        """
+        def flight():
+            cached = self._read_cache(key)
+            return cached if cached is not None else fetch()
+
+        return self._single_flight(key, flight)
+
     @abc.abstractmethod
     def fetch_transactions(self, address: str, start_block: int = 0) -> List[Transaction]:
         """Fetch transactions for an address."""
@@ -1,15 +1,69 @@
 import requests
 import time
 from datetime import datetime
-from typing import List
+from typing import List, Dict, Any, Optional, Tuple
 from ..models import Transaction
 from .base import BaseCollector
+from .fastjson import loads
+
+def normalize_chunk(raw_txs: List[Dict[str, Any]], chain: str) -> Tuple[List[Transaction], List[str]]:
+    """Normalize raw mempool.space txs (one row per output). Returns (transactions, warnings)."""
+    normalized = []
+    warnings = []
+    for tx in raw_txs:
+        try:
+            txid = tx["txid"]
+            block_height = tx["status"].get("block_height", 0)
+            ts = tx["status"].get("block_time", int(time.time()))
+            dt = datetime.fromtimestamp(ts)
+            
+            # Heuristic: Sender is the address of the first input
+            # (Assumes common ownership of inputs)
+            sender = None
+            if tx["vin"]:
+                prevout = tx["vin"][0].get("prevout")
+                if prevout:
+                    sender = prevout.get("scriptpubkey_address")
+                else:
+                    sender = "COINBASE" # Coinbase tx
+            
+            if not sender:
+                sender = "UNKNOWN"
+
+            # Expand outputs into transactions
+            for vout in tx["vout"]:
+                recipient = vout.get("scriptpubkey_address")
+                value = vout.get("value", 0)
+                
+                if not recipient:
+                    continue # OP_RETURN or similar
+                    
+                normalized.append(Transaction(
+                    chain="bitcoin",
+                    tx_hash=txid,
+                    block_number=block_height,
+                    timestamp=dt,
+                    from_address=sender,
+                    to_address=recipient,
+                    value_wei=int(value),
+                    decimals=8,
+                    token_symbol="BTC",
+                    gas_used=tx["fee"],
+                    gas_price=0
+                ))
+        except Exception as e:
+            warnings.append(f"WARNING: Failed to parse BTC tx {tx.get('txid')}: {e}")
+            continue
+            
+    return normalized, warnings
 
 class BitcoinCollector(BaseCollector):
     BASE_URL = "https://mempool.space/api"
     
-    def __init__(self, chain: str = "bitcoin", cache_dir: str = "data/raw/cache"):
+    def __init__(self, chain: str = "bitcoin", cache_dir: str = "data/raw/cache", base_url: Optional[str] = None):
         super().__init__(chain, cache_dir)
+        if base_url:
+            self.BASE_URL = base_url  # e.g. a local mock API
         self.last_call = 0
         self.rate_limit_delay = 0.5  # Respect mempool.space public limits
 
@@ -20,6 +74,29 @@ class BitcoinCollector(BaseCollector):
             time.sleep(self.rate_limit_delay - elapsed)
         self.last_call = time.time()
 
+    def _fetch_raw(self, address: str, cache_key: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Request recent txs from the API and cache the outcome.
+        Returns None on failure (nothing is cached).
+        """
+        self._rate_limit()
+        url = f"{self.BASE_URL}/address/{address}/txs"
+        try:
+            print(f"DEBUG: Requesting {url}")
+            resp = requests.get(url, timeout=15)
+            resp.raise_for_status()
+            raw_txs = loads(resp.content)
+            self.incomplete.discard(address)
+            if raw_txs:
+                self._write_cache(cache_key, raw_txs)
+            else:
+                self._write_negative_cache(cache_key)
+            return raw_txs
+        except Exception as e:
+            print(f"ERROR: BTC Fetch failed: {e}")
+            self.incomplete.add(address)
+            return None
+
     def fetch_transactions(self, address: str, start_block: int = 0) -> List[Transaction]:
         """
         Fetch TXs from Mempool.space.
@@ -31,68 +108,17 @@ class BitcoinCollector(BaseCollector):
         cache_key = f"{address}_btc_recent"
         cached_data = self._read_cache(cache_key)
         
-        raw_txs = []
-        if cached_data:
+        raw_txs: Optional[List[Dict[str, Any]]]
+        if cached_data is not None:
             print(f"DEBUG: Loaded {len(cached_data)} BTC tx batches from cache")
             raw_txs = cached_data
         else:
-            self._rate_limit()
-            url = f"{self.BASE_URL}/address/{address}/txs"
-            try:
-                print(f"DEBUG: Requesting {url}")
-                resp = requests.get(url, timeout=15)
-                resp.raise_for_status()
-                raw_txs = resp.json()
-                self._write_cache(cache_key, raw_txs)
-            except Exception as e:
-                print(f"ERROR: BTC Fetch failed: {e}")
+            raw_txs = self._fetch_through_cache(cache_key, lambda: self._fetch_raw(address, cache_key))
+            if raw_txs is None:
                 return []
 
         # 2. Normalize
-        normalized = []
-        for tx in raw_txs:
-            try:
-                txid = tx["txid"]
-                block_height = tx["status"].get("block_height", 0)
-                ts = tx["status"].get("block_time", int(time.time()))
-                dt = datetime.fromtimestamp(ts)
-                
-                # Heuristic: Sender is the address of the first input
-                # (Assumes common ownership of inputs)
-                sender = None
-                if tx["vin"]:
-                    prevout = tx["vin"][0].get("prevout")
-                    if prevout:
-                        sender = prevout.get("scriptpubkey_address")
-                    else:
-                        sender = "COINBASE" # Coinbase tx
-                
-                if not sender:
-                    sender = "UNKNOWN"
-
-                # Expand outputs into transactions
-                for vout in tx["vout"]:
-                    recipient = vout.get("scriptpubkey_address")
-                    value = vout.get("value", 0)
-                    
-                    if not recipient:
-                        continue # OP_RETURN or similar
-                        
-                    normalized.append(Transaction(
-                        chain="bitcoin",
-                        tx_hash=txid,
-                        block_number=block_height,
-                        timestamp=dt,
-                        from_address=sender,
-                        to_address=recipient,
-                        value_wei=int(value),
-                        decimals=8,
-                        token_symbol="BTC",
-                        gas_used=tx["fee"],
-                        gas_price=0
-                    ))
-            except Exception as e:
-                print(f"WARNING: Failed to parse BTC tx {tx.get('txid')}: {e}")
-                continue
-                
+        normalized, warnings = normalize_chunk(raw_txs, self.chain)
+        for warning in warnings:
+            print(warning)
         return normalized
@@ -0,0 +1,178 @@
+import gzip
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, TypeVar
+from .fastjson import dumps, loads
+
+T = TypeVar("T")
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 512 MB
+DEFAULT_NEGATIVE_TTL = 3600            # Re-check empty addresses hourly
+EVICT_TO_RATIO = 0.9                   # Evict down to 90% of budget to avoid thrashing
+
+POSITIVE_SUFFIX = ".json.gz"
+NEGATIVE_SUFFIX = ".neg.json.gz"
+
+
+class DiskCache:
+    """
+    Gzip-compressed JSON cache with a byte budget and LRU eviction.
+
+    Entries are written atomically (temp file + rename), so concurrent writers
+    never leave a partial file. Last access is tracked in each file's atime
+    (set explicitly on read), while mtime remains the write time used for TTLs.
+    Negative entries record "nothing there" results with a short TTL.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_MAX_BYTES, negative_ttl: int = DEFAULT_NEGATIVE_TTL):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.negative_ttl = negative_ttl
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _path(self, name: str, negative: bool = False) -> Path:
+        return self.root / f"{name}{NEGATIVE_SUFFIX if negative else POSITIVE_SUFFIX}"
+
+    def _load(self, path: Path, max_age_seconds: int) -> Optional[Any]:
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+
+        now = time.time()
+        if now - st.st_mtime > max_age_seconds:
+            return None
+
+        try:
+            with gzip.open(path, "rb") as f:
+                data = loads(f.read())
+        except (OSError, EOFError, ValueError):
+            return None
+
+        # Touch atime for LRU, keep mtime as the write time
+        try:
+            os.utime(path, (now, st.st_mtime))
+        except OSError:
+            pass
+        return data
+
+    def get(self, name: str, max_age_seconds: int) -> Optional[Any]:
+        """Return cached data (positive, else fresh negative entry) or None on miss."""
+        data = self._load(self._path(name), max_age_seconds)
+        if data is not None:
+            return data
+        return self._load(self._path(name, negative=True), min(max_age_seconds, self.negative_ttl))
+
+    def put(self, name: str, data: Any, negative: bool = False):
+        """Atomically write an entry, replacing any entry of the other kind."""
+        path = self._path(name, negative)
+        stale = self._path(name, not negative)
+        payload = gzip.compress(dumps(data), compresslevel=6)
+        # Bytes freed by replacing this entry (either kind), for the size counter
+        replaced = self._file_size(path) + self._file_size(stale)
+
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".tmp_")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+        try:
+            stale.unlink()
+        except FileNotFoundError:
+            pass
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(payload) - replaced
+            if self._size > self.max_bytes:
+                self._evict()
+
+    @staticmethod
+    def _file_size(path: Path) -> int:
+        try:
+            return path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def _scan_size(self) -> int:
+        total = 0
+        for entry in os.scandir(self.root):
+            if entry.is_file():
+                total += entry.stat().st_size
+        return total
+
+    def _evict(self):
+        """Delete least-recently-used entries until under the low watermark."""
+        entries = []
+        for entry in os.scandir(self.root):
+            if entry.is_file() and not entry.name.startswith(".tmp_"):
+                st = entry.stat()
+                entries.append((st.st_atime, st.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * EVICT_TO_RATIO
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+            except FileNotFoundError:
+                pass
+        self._size = total
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into one execution.
+    Callers that arrive while a call is in flight wait and share its result.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
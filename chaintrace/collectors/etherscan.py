@@ -1,25 +1,132 @@
 import requests
-import time
 from datetime import datetime
-from typing import List, Dict, Any
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
 from ..models import Transaction
 from .base import BaseCollector
+from .fastjson import loads
+from .scheduler import RequestScheduler, RetryQueue, Throttled, InvalidKey, PermanentError, RetryExhausted, DEFAULT_RATE
+
+def normalize_chunk(raw_txs: List[Dict[str, Any]], chain: str) -> Tuple[List[Transaction], List[str]]:
+    """Normalize raw txlist rows. Returns (transactions, warnings)."""
+    normalized = []
+    warnings = []
+    for tx in raw_txs:
+        try:
+            # Etherscan returns timestamps as strings
+            ts = int(tx["timeStamp"])
+            dt = datetime.fromtimestamp(ts)
+            
+            normalized.append(Transaction(
+                chain=chain,
+                tx_hash=tx["hash"],
+                block_number=int(tx["blockNumber"]),
+                timestamp=dt,
+                from_address=tx["from"],
+                to_address=tx["to"] if tx["to"] else None, # Empty string means contract creation usually
+                value_wei=int(tx["value"]),
+                gas_used=int(tx["gasUsed"]),
+                gas_price=int(tx["gasPrice"]),
+                is_error=tx.get("isError") == "1",
+                is_internal=False
+            ))
+        except Exception as e:
+            warnings.append(f"WARNING: Failed to parse tx {tx.get('hash')}: {e}")
+            continue
+            
+    return normalized, warnings
+
+# API error details worth retrying; any other error response is permanent
+TRANSIENT_ERRORS = ("timeout", "temporarily", "busy", "try again")
 
 class EtherscanCollector(BaseCollector):
     BASE_URL = "https://api.etherscan.io/v2/api"
     
-    def __init__(self, api_key: str, chain: str = "ethereum", cache_dir: str = "data/raw/cache"):
+    def __init__(
+        self,
+        api_key: str,
+        chain: str = "ethereum",
+        cache_dir: str = "data/raw/cache",
+        base_url: Optional[str] = None,
+        rate_per_key: float = DEFAULT_RATE,
+        retry_queue: Optional[str] = None,
+    ):
         super().__init__(chain, cache_dir)
-        self.api_key = api_key
-        self.last_call = 0
-        self.rate_limit_delay = 0.25  # 4 calls/sec (Free tier 5/sec)
+        if base_url:
+            self.BASE_URL = base_url  # e.g. a local mock API
+        # Comma-separated keys form a pool; throughput scales with key count
+        self.api_keys = [k.strip() for k in api_key.split(",") if k.strip()]
+        self.api_key = self.api_keys[0] if self.api_keys else api_key
+        self.retry_queue = RetryQueue(Path(retry_queue or self.cache_dir.parent / f"{chain}_retry_queue.json"))
+        self.scheduler = RequestScheduler(
+            self.api_keys or [api_key],
+            rate_per_key=rate_per_key,
+            queue=self.retry_queue,
+        )
+
+    def _request(self, params: Dict[str, Any], key: str) -> Dict[str, Any]:
+        """Single API call; maps Etherscan failure modes onto scheduler exceptions."""
+        resp = requests.get(self.BASE_URL, params={**params, "apikey": key}, timeout=10)
+        if resp.status_code == 429:
+            raise Throttled("HTTP 429")
+        resp.raise_for_status()
+        data = loads(resp.content)
+
+        if data.get("status") == "1" or data.get("message") == "No transactions found":
+            return data
+
+        detail = str(data.get("result", ""))
+        if "rate limit" in detail.lower():
+            raise Throttled(detail)
+        if "invalid api key" in detail.lower():
+            raise InvalidKey(detail)
+        message = f"Etherscan API error: {data.get('message')} ({detail})"
+        if any(t in detail.lower() for t in TRANSIENT_ERRORS):
+            raise RuntimeError(message)
+        raise PermanentError(message)
+
+    def _fetch_raw(self, address: str, start_block: int, cache_key: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Request the txlist from the API and cache the outcome.
+        Returns None on failure (nothing is cached). Retryable failures are queued
+        for `retry`; requests the API rejects outright are not.
+        """
+        params: Dict[str, Any] = {
+            "chainid": "1",  # Ethereum Mainnet
+            "module": "account",
+            "action": "txlist",
+            "address": address,
+            "startblock": start_block,
+            "endblock": 99999999,
+            "sort": "asc",
+        }
+        job = {"address": address, "start_block": start_block}
+        try:
+            data = self.scheduler.run(lambda key: self._request(params, key), job=job)
+        except RetryExhausted as e:
+            print(f"ERROR: Etherscan fetch for {address} failed after retries ({e}); queued for retry")
+            self.incomplete.add(address)
+            return None
+        except PermanentError as e:
+            print(f"ERROR: Etherscan rejected the request for {address} ({e}); not retried")
+            self.incomplete.add(address)
+            return None
+
+        self.incomplete.discard(address)
+        if data["status"] == "1":
+            # Write to cache
+            self._write_cache(cache_key, data["result"])
+            return data["result"]
+
+        # Negative cache so empty addresses aren't re-queried every run
+        self._write_negative_cache(cache_key)
+        return []
 
-    def _rate_limit(self):
-        now = time.time()
-        elapsed = now - self.last_call
-        if elapsed < self.rate_limit_delay:
-            time.sleep(self.rate_limit_delay - elapsed)
-        self.last_call = time.time()
+    def retry_pending(self) -> int:
+        """Replay queued failed requests. Returns how many are still pending."""
+        for job in self.retry_queue.pending():
+            self.fetch_transactions(job["address"], start_block=job.get("start_block", 0))
+        return len(self.retry_queue.pending())
 
     def fetch_transactions(self, address: str, start_block: int = 0) -> List[Transaction]:
         """
@@ -29,65 +136,18 @@ class EtherscanCollector(BaseCollector):
         cache_key = f"{address}_normal_{start_block}"
         cached_data = self._read_cache(cache_key)
         
-        raw_txs = []
-        if cached_data:
+        raw_txs: Optional[List[Dict[str, Any]]]
+        if cached_data is not None:
             print(f"DEBUG: Loaded {len(cached_data)} txs from cache")
             raw_txs = cached_data
         else:
-            # 2. Fetch from API
-            self._rate_limit()
-            params: Dict[str, Any] = {
-                "chainid": "1",  # Ethereum Mainnet
-                "module": "account",
-                "action": "txlist",
-                "address": address,
-                "startblock": start_block,
-                "endblock": 99999999,
-                "sort": "asc",
-                "apikey": self.api_key
-            }
-            try:
-                resp = requests.get(self.BASE_URL, params=params, timeout=10)
-                resp.raise_for_status()
-                data = resp.json()
-                
-                if data["status"] == "1" and data["message"] == "OK":
-                    raw_txs = data["result"]
-                    # Write to cache
-                    self._write_cache(cache_key, raw_txs)
-                elif data["message"] == "No transactions found":
-                    raw_txs = []
-                else:
-                    print(f"ERROR: Etherscan API error: {data['message']}")
-                    print(f"Full response: {data}")
-                    return []
-            except Exception as e:
-                print(f"ERROR: HTTP Request failed: {e}")
+            # 2. Fetch from API (concurrent callers for the same key share one request)
+            raw_txs = self._fetch_through_cache(cache_key, lambda: self._fetch_raw(address, start_block, cache_key))
+            if raw_txs is None:
                 return []
 
         # 3. Normalize
-        normalized = []
-        for tx in raw_txs:
-            try:
-                # Etherscan returns timestamps as strings
-                ts = int(tx["timeStamp"])
-                dt = datetime.fromtimestamp(ts)
-                
-                normalized.append(Transaction(
-                    chain=self.chain,
-                    tx_hash=tx["hash"],
-                    block_number=int(tx["blockNumber"]),
-                    timestamp=dt,
-                    from_address=tx["from"],
-                    to_address=tx["to"] if tx["to"] else None, # Empty string means contract creation usually
-                    value_wei=int(tx["value"]),
-                    gas_used=int(tx["gasUsed"]),
-                    gas_price=int(tx["gasPrice"]),
-                    is_error=tx.get("isError") == "1",
-                    is_internal=False
-                ))
-            except Exception as e:
-                print(f"WARNING: Failed to parse tx {tx.get('hash')}: {e}")
-                continue
-                
+        normalized, warnings = normalize_chunk(raw_txs, self.chain)
+        for warning in warnings:
+            print(warning)
         return normalized
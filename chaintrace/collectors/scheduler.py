@@ -0,0 +1,190 @@
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_RATE = 4.0       # Calls/sec per key to start with (free tier allows 5)
+MAX_RATE = 5.0
+MIN_RATE = 0.5
+RATE_STEP = 0.1          # Additive increase per success
+THROTTLE_COOLDOWN = 1.0  # Seconds a key rests after a rate-limit response
+
+
+class Throttled(Exception):
+    """The upstream rejected the call for exceeding its rate limit."""
+
+
+class InvalidKey(Exception):
+    """The upstream rejected the API key itself; it is removed from the pool."""
+
+
+class PermanentError(Exception):
+    """The upstream rejected the request itself (e.g. a bad address); retrying cannot help."""
+
+
+class RetryExhausted(Exception):
+    """All retries failed; the job (if any) was saved to the retry queue."""
+
+
+class RetryQueue:
+    """Persistent, de-duplicated list of failed request jobs (JSON file)."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def _load(self) -> List[Dict[str, Any]]:
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+
+    def _save(self, jobs: List[Dict[str, Any]]):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=".tmp_")
+        with os.fdopen(fd, "w") as f:
+            json.dump(jobs, f)
+        os.replace(tmp, self.path)
+
+    def pending(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self._load()
+
+    def add(self, job: Dict[str, Any]):
+        with self._lock:
+            jobs = self._load()
+            if job not in jobs:
+                jobs.append(job)
+                self._save(jobs)
+
+    def remove(self, job: Dict[str, Any]):
+        with self._lock:
+            jobs = self._load()
+            if job in jobs:
+                jobs.remove(job)
+                self._save(jobs)
+
+
+class RequestScheduler:
+    """
+    Spreads calls across a pool of API keys.
+
+    Each key has its own call budget (calls/sec) tuned by AIMD: a success
+    raises it by RATE_STEP, a rate-limit response halves it and rests the key.
+    Failed calls are retried with full-jitter exponential backoff; if retries
+    run out (or every key has been rejected), the job is persisted to the
+    retry queue and RetryExhausted raised. PermanentError is neither retried
+    nor queued.
+    """
+
+    def __init__(
+        self,
+        keys: List[str],
+        rate_per_key: float = DEFAULT_RATE,
+        max_rate_per_key: float = MAX_RATE,
+        min_rate_per_key: float = MIN_RATE,
+        max_retries: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        queue: Optional[RetryQueue] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not keys:
+            raise ValueError("RequestScheduler needs at least one API key")
+        self.rates: Dict[str, float] = {k: rate_per_key for k in keys}
+        self.next_ok: Dict[str, float] = {k: 0.0 for k in keys}
+        self.max_rate = max_rate_per_key
+        self.min_rate = min_rate_per_key
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.queue = queue
+        self._sleep = sleep
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    @property
+    def keys(self) -> List[str]:
+        return list(self.rates)
+
+    def _acquire(self) -> str:
+        """Reserve the next free slot on the key that is available soonest."""
+        with self._lock:
+            if not self.rates:
+                raise InvalidKey("No valid API keys left in the pool")
+            key = min(self.next_ok, key=self.next_ok.__getitem__)
+            now = self._clock()
+            start = max(now, self.next_ok[key])
+            self.next_ok[key] = start + 1.0 / self.rates[key]
+        if start > now:
+            self._sleep(start - now)
+        return key
+
+    def _success(self, key: str):
+        with self._lock:
+            if key in self.rates:
+                self.rates[key] = min(self.max_rate, self.rates[key] + RATE_STEP)
+
+    def _throttled(self, key: str):
+        with self._lock:
+            if key in self.rates:
+                self.rates[key] = max(self.min_rate, self.rates[key] / 2)
+                self.next_ok[key] = max(self.next_ok[key], self._clock() + THROTTLE_COOLDOWN)
+
+    def _disable(self, key: str):
+        with self._lock:
+            self.rates.pop(key, None)
+            self.next_ok.pop(key, None)
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def run(self, request: Callable[[str], T], job: Optional[Dict[str, Any]] = None) -> T:
+        """
+        Execute request(key) until it succeeds or retries are exhausted.
+        request raises Throttled / InvalidKey / PermanentError / any other Exception to signal failure.
+        """
+        last_error: Optional[Exception] = None
+        for attempt in range(self.max_retries + 1):
+            try:
+                key = self._acquire()
+            except InvalidKey as e:
+                last_error = e  # Pool is empty: give up, but keep the job
+                break
+            try:
+                result = request(key)
+            except PermanentError:
+                if job is not None and self.queue is not None:
+                    self.queue.remove(job)
+                raise
+            except Throttled as e:
+                self._throttled(key)
+                last_error = e
+            except InvalidKey as e:
+                self._disable(key)
+                last_error = e
+                if not self.rates:
+                    break
+                continue  # Another key can go straight away
+            except Exception as e:
+                last_error = e
+            else:
+                self._success(key)
+                if job is not None and self.queue is not None:
+                    self.queue.remove(job)
+                return result
+
+            if attempt < self.max_retries:
+                self._sleep(self.backoff(attempt))
+
+        if job is not None and self.queue is not None:
+            self.queue.add(job)
+        raise RetryExhausted(str(last_error)) from last_error
@@ -1,3 +1,5 @@
 from .builder import GraphBuilder
+from .compact import CompactGraph
+from .diff import GraphSnapshot, diff_snapshots
 
-__all__ = ["GraphBuilder"]
+__all__ = ["GraphBuilder", "CompactGraph", "GraphSnapshot", "diff_snapshots"]
@@ -0,0 +1,342 @@
+import math
+import networkx as nx
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from ..models import Transaction
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+MASK32 = (1 << 32) - 1
+MASK64 = (1 << 64) - 1
+
+CONTRACT_CREATION = "CONTRACT_CREATION"
+
+
+def to_micros(dt: datetime) -> int:
+    """Exact integer microseconds for a (naive) timestamp; aware ones are taken as UTC."""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return (dt - _EPOCH) // _MICROSECOND
+
+
+def from_micros(us: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=int(us))
+
+
+def edge_width(value: float) -> float:
+    """Log scaling for visual width (1 to 10 pixels range)."""
+    if value > 0:
+        return min(1 + math.log(value + 1), 10)
+    return 1.0
+
+
+def edge_label(value: float, count: int, symbol: str) -> Tuple[str, str]:
+    """Edge (label, title) strings, as shown in the report and exported to CSV."""
+    return f"{value:.4f} {symbol}", f"Transfers: {count}<br>Vol: {value:.4f} {symbol}"
+
+
+def _gather(indptr: np.ndarray, indices: np.ndarray, ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(origin, neighbour) pairs for every CSR row in `ids`."""
+    starts = indptr[ids]
+    counts = indptr[ids + 1] - starts
+    total = int(counts.sum())
+    offsets = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+    return np.repeat(ids, counts), indices[np.arange(total) + offsets]
+
+
+class CompactGraph:
+    """
+    Memory-lean aggregated transfer graph; the graph every analysis runs on.
+
+    Addresses are interned to integer ids. Each (sender, recipient) pair is one
+    edge keyed `src << 32 | dst` in a sorted int64 array, so the edge list is
+    already CSR ordered by source. Per edge: transfer count, the exact wei sum
+    as two uint64 limbs, and first/last seen as int64 microseconds (about 44
+    bytes in total). Tags and labels are sparse per-node dicts; ranking metrics
+    are dense per-node arrays. Display strings and ISO timestamps are produced
+    only by `to_networkx`/`to_dataframe`, for rendering and export.
+    """
+
+    def __init__(self, decimals: int = 18, symbol: str = "ETH"):
+        self.decimals = decimals
+        self.symbol = symbol
+        self.nodes: List[Any] = []
+        self.index: Dict[Any, int] = {}
+        # Tags/labels for the few nodes that have them (node id -> attrs)
+        self.node_attrs: Dict[int, Dict[str, Any]] = {}
+        # Ranking output (see analysis.ranking), one float per node
+        self.metrics: Dict[str, np.ndarray] = {}
+
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.count = np.zeros(0, dtype=np.int32)
+        self.value_hi = np.zeros(0, dtype=np.uint64)  # Wei sum = hi * 2**64 + lo
+        self.value_lo = np.zeros(0, dtype=np.uint64)
+        self.first_seen = np.zeros(0, dtype=np.int64)  # Microseconds since epoch
+        self.last_seen = np.zeros(0, dtype=np.int64)
+        # Distinct counterparties per node, maintained by extend()
+        self.in_deg = np.zeros(0, dtype=np.int32)
+        self.out_deg = np.zeros(0, dtype=np.int32)
+
+        # Adjacency caches, reset whenever the edge set changes
+        self._csr: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._in_csr: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    @classmethod
+    def from_transactions(cls, transactions: List[Transaction]) -> "CompactGraph":
+        core = cls()
+        core.extend(transactions)
+        return core
+
+    def intern(self, address: Any) -> int:
+        i = self.index.get(address)
+        if i is None:
+            i = self.index[address] = len(self.nodes)
+            self.nodes.append(address)
+        return i
+
+    # networkx-style read helpers
+
+    def number_of_nodes(self) -> int:
+        return len(self.nodes)
+
+    def number_of_edges(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, address: Any) -> bool:
+        return address in self.index
+
+    def has_edge(self, u: Any, v: Any) -> bool:
+        return self.get_edge_data(u, v) is not None
+
+    def get_edge_data(self, u: Any, v: Any) -> Optional[Dict[str, Any]]:
+        if u not in self.index or v not in self.index:
+            return None
+        i = self.edge_index(self.index[u], self.index[v])
+        return None if i is None else self.edge_attrs(i)
+
+    def node(self, address: Any) -> Dict[str, Any]:
+        """All attributes of a node (tags, labels, ranking metrics)."""
+        return self.node_data(self.index[address])
+
+    def node_data(self, i: int) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"type": "address"}
+        data.update(self.node_attrs.get(i, {}))
+        for name, values in self.metrics.items():
+            data[name] = float(values[i])
+        return data
+
+    def nbytes(self) -> int:
+        """Bytes held by the edge and degree arrays (excludes the address table)."""
+        return sum(a.nbytes for a in (self.keys, self.count, self.value_hi, self.value_lo,
+                                      self.first_seen, self.last_seen, self.in_deg, self.out_deg))
+
+    # Edge arrays
+
+    @property
+    def src(self) -> np.ndarray:
+        return (self.keys >> 32).astype(np.int32)
+
+    @property
+    def dst(self) -> np.ndarray:
+        return self.csr()[1]
+
+    def csr(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Out-adjacency (indptr, dst ids); edges are already sorted by source."""
+        if self._csr is None:
+            bounds = np.arange(len(self.nodes) + 1, dtype=np.int64) << 32
+            self._csr = (np.searchsorted(self.keys, bounds), (self.keys & MASK32).astype(np.int32))
+        return self._csr
+
+    def in_csr(self) -> Tuple[np.ndarray, np.ndarray]:
+        """In-adjacency (indptr, src ids)."""
+        if self._in_csr is None:
+            dst = self.dst
+            order = np.argsort(dst, kind="stable")
+            indptr = np.zeros(len(self.nodes) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(dst, minlength=len(self.nodes)), out=indptr[1:])
+            self._in_csr = (indptr, self.src[order])
+        return self._in_csr
+
+    def out_degrees(self) -> np.ndarray:
+        return self.out_deg
+
+    def in_degrees(self) -> np.ndarray:
+        return self.in_deg
+
+    def expand(self, ids: np.ndarray, direction: str = "out") -> Tuple[np.ndarray, np.ndarray]:
+        """(origin, neighbour) pairs one hop from `ids`; direction is out, in or both."""
+        if direction not in ("out", "in", "both"):
+            raise ValueError("direction must be one of: in, out, both")
+        ids = np.asarray(ids, dtype=np.int64)
+        hops = []
+        if direction in ("out", "both"):
+            hops.append(_gather(*self.csr(), ids))
+        if direction in ("in", "both"):
+            hops.append(_gather(*self.in_csr(), ids))
+        return np.concatenate([u for u, _ in hops]), np.concatenate([v for _, v in hops])
+
+    def values(self) -> np.ndarray:
+        """Per-edge value in human units (float; use `edge_value` for exact sums)."""
+        wei = self.value_hi.astype(np.float64) * float(1 << 64) + self.value_lo.astype(np.float64)
+        return wei / 10 ** self.decimals
+
+    def edge_wei(self, i: int) -> int:
+        return (int(self.value_hi[i]) << 64) | int(self.value_lo[i])
+
+    def edge_value(self, i: int) -> float:
+        """Exact wei sum divided once (no float accumulation)."""
+        return self.edge_wei(i) / 10 ** self.decimals
+
+    def edge_index(self, s: int, d: int) -> Optional[int]:
+        key = (s << 32) | d
+        pos = int(np.searchsorted(self.keys, key))
+        if pos < len(self.keys) and self.keys[pos] == key:
+            return pos
+        return None
+
+    # Updates
+
+    def extend(self, transactions: List[Transaction]) -> Set[Any]:
+        """
+        Merge transactions into the aggregated edges; returns the touched addresses.
+
+        The batch is aggregated first (exact integer wei). Existing edges are
+        updated in place after a binary search (O(k log E) for k new pairs);
+        only pairs not seen before are spliced into the sorted arrays, one
+        linear copy per array and no re-sort.
+        """
+        # Determine decimals/symbol from first tx (assumption: homogenous chain)
+        if not self.nodes and transactions:
+            self.decimals = transactions[0].decimals
+            self.symbol = transactions[0].token_symbol or "Units"
+
+        batch: Dict[int, List[int]] = {}
+        for tx in transactions:
+            if tx.is_error:
+                continue
+            # Handle contract creation (dst=None)
+            key = (self.intern(tx.from_address) << 32) | self.intern(tx.to_address or CONTRACT_CREATION)
+            t = to_micros(tx.timestamp)
+            agg = batch.get(key)
+            if agg is None:
+                batch[key] = [1, tx.value_wei, t, t]
+            else:
+                agg[0] += 1
+                agg[1] += tx.value_wei
+                agg[2] = min(agg[2], t)
+                agg[3] = max(agg[3], t)
+
+        if not batch:
+            return set()
+
+        rows = sorted(batch.items())
+        k = len(rows)
+        keys = np.fromiter((key for key, _ in rows), dtype=np.int64, count=k)
+        count = np.fromiter((r[0] for _, r in rows), dtype=np.int64, count=k)
+        hi = np.fromiter((r[1] >> 64 for _, r in rows), dtype=np.uint64, count=k)
+        lo = np.fromiter((r[1] & MASK64 for _, r in rows), dtype=np.uint64, count=k)
+        first = np.fromiter((r[2] for _, r in rows), dtype=np.int64, count=k)
+        last = np.fromiter((r[3] for _, r in rows), dtype=np.int64, count=k)
+
+        pos = np.searchsorted(self.keys, keys)
+        hit = pos < len(self.keys)
+        hit[hit] = self.keys[pos[hit]] == keys[hit]
+
+        p = pos[hit]
+        self.count[p] += count[hit]
+        new_lo = self.value_lo[p] + lo[hit]  # Wraps modulo 2**64; carry below
+        self.value_hi[p] += hi[hit] + (new_lo < lo[hit]).astype(np.uint64)
+        self.value_lo[p] = new_lo
+        self.first_seen[p] = np.minimum(self.first_seen[p], first[hit])
+        self.last_seen[p] = np.maximum(self.last_seen[p], last[hit])
+
+        miss = ~hit
+        if miss.any():
+            at = pos[miss]
+            self.keys = np.insert(self.keys, at, keys[miss])
+            self.count = np.insert(self.count, at, count[miss])
+            self.value_hi = np.insert(self.value_hi, at, hi[miss])
+            self.value_lo = np.insert(self.value_lo, at, lo[miss])
+            self.first_seen = np.insert(self.first_seen, at, first[miss])
+            self.last_seen = np.insert(self.last_seen, at, last[miss])
+            self._csr = self._in_csr = None
+
+        # Degrees only change for new pairs: O(k), no pass over the edge set
+        grow = len(self.nodes) - len(self.in_deg)
+        if grow:
+            self.in_deg = np.append(self.in_deg, np.zeros(grow, dtype=np.int32))
+            self.out_deg = np.append(self.out_deg, np.zeros(grow, dtype=np.int32))
+        np.add.at(self.out_deg, keys[miss] >> 32, 1)
+        np.add.at(self.in_deg, keys[miss] & MASK32, 1)
+
+        # Keep ranking arrays aligned with the node table (new nodes score 0)
+        for name, values in self.metrics.items():
+            if len(values) < len(self.nodes):
+                self.metrics[name] = np.append(values, np.zeros(len(self.nodes) - len(values)))
+
+        touched: Set[Any] = set()
+        for key, _ in rows:
+            touched.add(self.nodes[key >> 32])
+            touched.add(self.nodes[key & MASK32])
+        return touched
+
+    # Render/export views
+
+    def edge_attrs(self, i: int) -> Dict[str, Any]:
+        """networkx-compatible attributes for edge i (labels are added by the report)."""
+        value = self.edge_value(i)
+        width = edge_width(value)
+        return {
+            "weight": width,  # Use scaled width for physics to avoid 10^18 force explosion
+            "width": width,   # Visual width
+            "count": int(self.count[i]),
+            "value_human": value,
+            "first_seen": from_micros(self.first_seen[i]).isoformat(),
+            "last_seen": from_micros(self.last_seen[i]).isoformat(),
+        }
+
+    def to_networkx(self, edge_ids: Optional[Iterable[int]] = None,
+                    node_ids: Optional[Iterable[int]] = None) -> nx.DiGraph:
+        """
+        DiGraph for rendering/export: the whole graph, or only `edge_ids`
+        (plus their endpoints and any extra `node_ids`).
+        """
+        G: nx.DiGraph = nx.DiGraph(symbol=self.symbol)
+        if edge_ids is None and node_ids is None:
+            edges = np.arange(len(self.keys))
+            nodes: Iterable[int] = range(len(self.nodes))
+        else:
+            edges = np.asarray([] if edge_ids is None else list(edge_ids), dtype=np.int64)
+            keys = self.keys[edges]
+            extra = [] if node_ids is None else list(node_ids)
+            nodes = dict.fromkeys(extra + (keys >> 32).tolist() + (keys & MASK32).tolist())
+
+        G.add_nodes_from((self.nodes[i], self.node_data(i)) for i in nodes)
+        for i, key in zip(edges.tolist(), self.keys[edges].tolist()):
+            G.add_edge(self.nodes[key >> 32], self.nodes[key & MASK32], **self.edge_attrs(i))
+        return G
+
+    def subgraph(self, node_ids: Iterable[int]) -> nx.DiGraph:
+        """Induced subgraph on `node_ids`, as a DiGraph."""
+        ids = np.unique(np.asarray(list(node_ids), dtype=np.int64))
+        keep = np.isin(self.keys >> 32, ids) & np.isin(self.keys & MASK32, ids)
+        return self.to_networkx(np.flatnonzero(keep), ids.tolist())
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Edge list with the same columns as the networkx export, plus the
+        label/title strings that Gephi/Maltego/Neo4j imports display.
+        """
+        rows = []
+        for i in range(len(self.keys)):
+            attrs = self.edge_attrs(i)
+            attrs["label"], attrs["title"] = edge_label(attrs["value_human"], attrs["count"], self.symbol)
+            rows.append(attrs)
+        columns = ["weight", "width", "count", "value_human", "first_seen", "last_seen", "label", "title"]
+        df = pd.DataFrame(rows, columns=columns)
+        df.insert(0, "source", [self.nodes[k >> 32] for k in self.keys.tolist()])
+        df.insert(1, "target", [self.nodes[k & MASK32] for k in self.keys.tolist()])
+        return df
@@ -0,0 +1,139 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from .compact import CompactGraph
+
+# Records are spread over fixed buckets by key hash. Each bucket carries an
+# order-independent fingerprint (sum of record hashes), so two snapshots are
+# compared bucket by bucket and only mismatched buckets are diffed in detail.
+# Building, saving and loading a snapshot is still linear in the graph size.
+NUM_BUCKETS = 256
+FINGERPRINT_MASK = (1 << 64) - 1
+
+LARGE_FLOW_THRESHOLD = 10.0  # Human units (ETH/BTC) for the large_flows list
+
+
+def _h64(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "big")
+
+
+class GraphSnapshot:
+    """
+    Compact, diffable summary of a graph: hashed edge keys with their
+    count/value, and node tags, each grouped into fingerprinted buckets.
+    """
+
+    def __init__(self, edges: List[Dict[str, Any]], nodes: List[Dict[str, Any]],
+                 edge_prints: List[int], node_prints: List[int]):
+        self.edges = edges        # per bucket: {edge_key_hash: [src, dst, count, value]}
+        self.nodes = nodes        # per bucket: {node: tag}
+        self.edge_prints = edge_prints
+        self.node_prints = node_prints
+
+    @classmethod
+    def from_graph(cls, G: CompactGraph) -> "GraphSnapshot":
+        edges: List[Dict[str, Any]] = [{} for _ in range(NUM_BUCKETS)]
+        nodes: List[Dict[str, Any]] = [{} for _ in range(NUM_BUCKETS)]
+        edge_prints = [0] * NUM_BUCKETS
+        node_prints = [0] * NUM_BUCKETS
+
+        for i, (s, d) in enumerate(zip(G.src.tolist(), G.dst.tolist())):
+            u, v = G.nodes[s], G.nodes[d]
+            key = _h64(f"{u}|{v}")
+            b = key % NUM_BUCKETS
+            count, value = int(G.count[i]), round(G.edge_value(i), 12)
+            edges[b][str(key)] = [u, v, count, value]
+            edge_prints[b] = (edge_prints[b] + _h64(f"{key}|{count}|{value!r}")) & FINGERPRINT_MASK
+
+        for i, n in enumerate(G.nodes):
+            b = _h64(str(n)) % NUM_BUCKETS
+            tag = G.node_attrs.get(i, {}).get("tag")
+            nodes[b][n] = tag
+            node_prints[b] = (node_prints[b] + _h64(f"{n}|{tag}")) & FINGERPRINT_MASK
+
+        return cls(edges, nodes, edge_prints, node_prints)
+
+    @property
+    def fingerprint(self) -> int:
+        """Whole-graph fingerprint; equal fingerprints mean no change."""
+        return _h64(",".join(map(str, self.edge_prints + self.node_prints)))
+
+    def save(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({
+                "edges": self.edges, "nodes": self.nodes,
+                "edge_prints": self.edge_prints, "node_prints": self.node_prints,
+            }, f)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["GraphSnapshot"]:
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return cls(data["edges"], data["nodes"], data["edge_prints"], data["node_prints"])
+
+
+def diff_snapshots(old: Optional[GraphSnapshot], new: GraphSnapshot,
+                   large_flow: float = LARGE_FLOW_THRESHOLD) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Compact change set between two snapshots. Only buckets whose fingerprints
+    differ are inspected record by record, so an unchanged graph costs
+    NUM_BUCKETS comparisons and a change touching k buckets costs about
+    k/NUM_BUCKETS of a full comparison (all of it once changes reach most buckets).
+    `old=None` (first run) reports everything as added.
+    """
+    if old is None:
+        old = GraphSnapshot([{} for _ in range(NUM_BUCKETS)], [{} for _ in range(NUM_BUCKETS)],
+                            [0] * NUM_BUCKETS, [0] * NUM_BUCKETS)
+
+    changes: Dict[str, List[Dict[str, Any]]] = {
+        "added_nodes": [], "removed_nodes": [], "tag_transitions": [],
+        "added_edges": [], "removed_edges": [], "changed_edges": [], "large_flows": [],
+    }
+
+    for b in range(NUM_BUCKETS):
+        if old.node_prints[b] == new.node_prints[b]:
+            continue
+        before, after = old.nodes[b], new.nodes[b]
+        for n, tag in after.items():
+            if n not in before:
+                changes["added_nodes"].append({"node": n, "tag": tag})
+            elif before[n] != tag:
+                changes["tag_transitions"].append({"node": n, "from": before[n], "to": tag})
+        for n, tag in before.items():
+            if n not in after:
+                changes["removed_nodes"].append({"node": n, "tag": tag})
+
+    for b in range(NUM_BUCKETS):
+        if old.edge_prints[b] == new.edge_prints[b]:
+            continue
+        before, after = old.edges[b], new.edges[b]
+        for key, (u, v, count, value) in after.items():
+            prev = before.get(key)
+            if prev is None:
+                entry = {"source": u, "target": v, "count": count, "value": value}
+                changes["added_edges"].append(entry)
+                delta = value
+            else:
+                delta = value - prev[3]
+                if count == prev[2] and delta == 0:
+                    continue
+                changes["changed_edges"].append({
+                    "source": u, "target": v,
+                    "count_delta": count - prev[2], "value_delta": delta,
+                })
+            if delta >= large_flow:
+                changes["large_flows"].append({"source": u, "target": v, "value_delta": delta})
+        for key, (u, v, count, value) in before.items():
+            if key not in after:
+                changes["removed_edges"].append({"source": u, "target": v, "count": count, "value": value})
+
+    return changes
+
+
+def is_empty(changes: Dict[str, List[Dict[str, Any]]]) -> bool:
+    return not any(changes.values())
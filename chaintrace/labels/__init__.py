@@ -0,0 +1,3 @@
+from .index import LabelIndex, address_hash
+
+__all__ = ["LabelIndex", "address_hash"]
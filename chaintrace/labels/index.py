@@ -0,0 +1,190 @@
+import array
+import csv
+import hashlib
+import json
+import numpy as np
+from pathlib import Path
+from typing import AbstractSet, Dict, Iterable, List, Optional, Tuple
+
+# Index files inside a label directory
+KEYS_FILE = "keys.npy"            # uint64 address hashes, sorted
+IDS_FILE = "ids.npy"              # uint32 label id per key
+BUCKETS_FILE = "buckets.npy"      # int64 offsets of each hash-prefix bucket into keys
+NAMES_FILE = "names.bin"          # UTF-8 label names, concatenated
+OFFSETS_FILE = "name_offsets.npy"  # uint64 start of each label name in NAMES_FILE (+ end)
+CATEGORY_IDS_FILE = "label_categories.npy"  # uint16 category id per label
+META_FILE = "categories.json"     # category table: ["exchange", "mixer", ...]
+
+# Hash-prefix directory: 2^16 buckets keeps each bucket tiny for millions of rows
+BUCKET_BITS = 16
+
+
+def address_hash(address: str) -> int:
+    """Stable 64-bit hash of a (case-normalised) address."""
+    digest = hashlib.blake2b(address.strip().lower().encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+class LabelIndex:
+    """
+    Read-only address -> known entity index.
+
+    Keys are 64-bit address hashes stored sorted in a memory-mapped array, with a
+    hash-prefix bucket directory so a lookup only touches one small bucket (O(1)
+    expected). Label names live in a memory-mapped UTF-8 blob addressed by an
+    offset array and are decoded only on lookup; categories are small integer
+    ids into a short table.
+    """
+
+    def __init__(self, keys: np.ndarray, ids: np.ndarray, buckets: np.ndarray, names: np.ndarray,
+                 name_offsets: np.ndarray, label_categories: np.ndarray, categories: List[str]):
+        self.keys = keys
+        self.ids = ids
+        self.buckets = buckets
+        self.names = names
+        self.name_offsets = name_offsets
+        self.label_categories = label_categories
+        self.categories = categories
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def num_labels(self) -> int:
+        """Distinct (name, category) labels."""
+        return len(self.label_categories)
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        return (Path(path) / META_FILE).exists()
+
+    @classmethod
+    def load(cls, path: str) -> "LabelIndex":
+        """Open an index built by `build`. Arrays and names are memory-mapped, not read."""
+        root = Path(path)
+        with open(root / META_FILE, "r") as f:
+            categories = json.load(f)
+        names_path = root / NAMES_FILE
+        # np.memmap cannot map an empty file
+        names: np.ndarray
+        if names_path.stat().st_size:
+            names = np.memmap(names_path, dtype=np.uint8, mode="r")
+        else:
+            names = np.zeros(0, dtype=np.uint8)
+        return cls(
+            keys=np.load(root / KEYS_FILE, mmap_mode="r"),
+            ids=np.load(root / IDS_FILE, mmap_mode="r"),
+            buckets=np.load(root / BUCKETS_FILE),
+            names=names,
+            name_offsets=np.load(root / OFFSETS_FILE, mmap_mode="r"),
+            label_categories=np.load(root / CATEGORY_IDS_FILE, mmap_mode="r"),
+            categories=categories,
+        )
+
+    @classmethod
+    def build(cls, rows: Iterable[Tuple[str, str, str]], path: str) -> "LabelIndex":
+        """
+        Build and persist an index from (address, name, category) rows.
+        Later rows win when an address appears more than once.
+        """
+        root = Path(path)
+        root.mkdir(parents=True, exist_ok=True)
+
+        label_ids: Dict[Tuple[str, str], int] = {}
+        category_ids: Dict[str, int] = {}
+        # Compact typed buffers rather than lists of Python ints
+        hashes = array.array("Q")
+        ids = array.array("I")
+        offsets = array.array("Q", [0])
+        label_cats = array.array("H")
+
+        with open(root / NAMES_FILE, "wb") as names:
+            for address, name, category in rows:
+                if not address:
+                    continue
+                entry = (name.strip(), category.strip().lower())
+                if entry not in label_ids:
+                    label_ids[entry] = len(label_cats)
+                    encoded = entry[0].encode("utf-8")
+                    names.write(encoded)
+                    offsets.append(offsets[-1] + len(encoded))
+                    label_cats.append(category_ids.setdefault(entry[1], len(category_ids)))
+                hashes.append(address_hash(address))
+                ids.append(label_ids[entry])
+
+        key_arr = np.frombuffer(hashes, dtype=np.uint64) if hashes else np.zeros(0, dtype=np.uint64)
+        id_arr = np.frombuffer(ids, dtype=np.uint32) if ids else np.zeros(0, dtype=np.uint32)
+
+        # Sort by key; for duplicates keep the last occurrence
+        order = np.lexsort((np.arange(len(key_arr)), key_arr))
+        key_arr, id_arr = key_arr[order], id_arr[order]
+        if len(key_arr):
+            last = np.append(key_arr[1:] != key_arr[:-1], True)
+            key_arr, id_arr = key_arr[last], id_arr[last]
+
+        prefixes = np.arange(2 ** BUCKET_BITS + 1, dtype=np.uint64) << np.uint64(64 - BUCKET_BITS)
+        buckets = np.searchsorted(key_arr, prefixes[:-1]).astype(np.int64)
+        buckets = np.append(buckets, len(key_arr))
+
+        np.save(root / KEYS_FILE, key_arr)
+        np.save(root / IDS_FILE, id_arr)
+        np.save(root / BUCKETS_FILE, buckets)
+        np.save(root / OFFSETS_FILE, np.frombuffer(offsets, dtype=np.uint64))
+        np.save(root / CATEGORY_IDS_FILE, np.array(label_cats, dtype=np.uint16))
+        with open(root / META_FILE, "w") as f:
+            json.dump(list(category_ids), f)
+
+        return cls.load(path)
+
+    @classmethod
+    def build_from_csv(cls, sources: List[str], path: str) -> "LabelIndex":
+        """
+        Build from CSV files with an `address,name,category` header.
+        Rows are streamed, so source size is bounded only by the hash arrays.
+        """
+        def rows():
+            for source in sources:
+                with open(source, "r", newline="") as f:
+                    for row in csv.DictReader(f):
+                        yield row.get("address", ""), row.get("name", ""), row.get("category", "")
+
+        return cls.build(rows(), path)
+
+    def _find(self, h: int) -> int:
+        b = h >> (64 - BUCKET_BITS)
+        lo, hi = int(self.buckets[b]), int(self.buckets[b + 1])
+        if lo == hi:
+            return -1
+        bucket = self.keys[lo:hi]
+        pos = int(np.searchsorted(bucket, np.uint64(h)))
+        if pos < len(bucket) and int(bucket[pos]) == h:
+            return lo + pos
+        return -1
+
+    def _label_id(self, address: Optional[str]) -> int:
+        if not address:
+            return -1
+        pos = self._find(address_hash(address))
+        return -1 if pos < 0 else int(self.ids[pos])
+
+    def lookup(self, address: Optional[str]) -> Optional[Dict[str, str]]:
+        """Return {"name", "category"} for a known address, else None."""
+        label_id = self._label_id(address)
+        if label_id < 0:
+            return None
+        start, end = int(self.name_offsets[label_id]), int(self.name_offsets[label_id + 1])
+        return {
+            "name": self.names[start:end].tobytes().decode("utf-8"),
+            "category": self.categories[int(self.label_categories[label_id])],
+        }
+
+    def category(self, address: Optional[str]) -> Optional[str]:
+        """Category of a known address (no name decoding), else None."""
+        label_id = self._label_id(address)
+        if label_id < 0:
+            return None
+        return self.categories[int(self.label_categories[label_id])]
+
+    def is_category(self, address: Optional[str], categories: AbstractSet[str]) -> bool:
+        """`categories` should be a (frozen)set; it is called once per traced peer."""
+        return self.category(address) in categories
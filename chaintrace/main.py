@@ -1,6 +1,7 @@
 import typer
 import os
 import json
+from typing import Dict, List
 from rich.console import Console
 from dotenv import load_dotenv
 
@@ -8,7 +9,11 @@ from dotenv import load_dotenv
 from .collectors.etherscan import EtherscanCollector
 from .graph.builder import GraphBuilder
 from .analysis.heuristics import tag_nodes
+from .analysis.ranking import rank_nodes
 from .visualize.report import HTMLReportGenerator
+from .labels.index import LabelIndex
+from .tracer import trace
+from .watch import Watcher, load_watchlist
 
 # Load env
 load_dotenv()
@@ -21,7 +26,9 @@ def analyze(
     address: str = typer.Option(..., help="Target address to analyze"),
     chain: str = typer.Option("ethereum", help="Blockchain network (ethereum, arbitrum)"),
     depth: int = typer.Option(1, help="Hop depth for tracing"),
-    output_dir: str = typer.Option("data/outputs", help="Directory for results")
+    output_dir: str = typer.Option("data/outputs", help="Directory for results"),
+    top: int = typer.Option(25, help="Number of ranked nodes in the summary"),
+    labels_dir: str = typer.Option("data/labels", "--labels", envvar="CHAINTRACE_LABELS", help="Known-entity label index (see `labels`)")
 ):
     """
     Analyze a specific address, build interaction graph, and generate report.
@@ -41,13 +48,20 @@ def analyze(
             console.print("[bold red]ERROR: ETHERSCAN_API_KEY not found in .env[/bold red]")
             raise typer.Exit(code=1)
         collector = EtherscanCollector(api_key=api_key, chain=chain)
+
+    labels = None
+    if LabelIndex.exists(labels_dir):
+        labels = LabelIndex.load(labels_dir)
+        console.print(f"  Loaded {len(labels)} known-entity labels.")
     
     # 1. Fetch
     console.print("[yellow]Step 1: Fetching transactions...[/yellow]")
-    # For MVP, we only do depth 1 (fetch target's txs). 
-    # Real depth > 1 requires recursive fetching.
-    txs = collector.fetch_transactions(address)
+    # Multi-hop: expansion stops at known exchanges
+    txs = trace(collector, address, depth=depth, labels=labels)
     console.print(f"  Fetched {len(txs)} transactions.")
+    if collector.incomplete:
+        console.print(f"[bold red]  WARNING: {len(collector.incomplete)} address(es) could not be fetched (throttled/failed); "
+                      f"the trace is incomplete. Etherscan failures can be replayed with `retry`.[/bold red]")
     
     if not txs:
         console.print("[red]No transactions found. Exiting.[/red]")
@@ -56,12 +70,13 @@ def analyze(
     # 2. Build Graph
     console.print("[yellow]Step 2: Building graph...[/yellow]")
     builder = GraphBuilder(txs)
-    G = builder.build()
-    console.print(f"  Graph created: {len(G.nodes)} nodes, {len(G.edges)} edges.")
+    G = builder.build_compact()
+    console.print(f"  Graph created: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges.")
     
     # 3. Analytics
     console.print("[yellow]Step 3: Finding patterns...[/yellow]")
-    tag_nodes(G)
+    tag_nodes(G, labels=labels)
+    top_nodes = rank_nodes(G, top_n=top)
     
     # 4. Outputs
     console.print("[yellow]Step 4: Generating outputs...[/yellow]")
@@ -73,12 +88,12 @@ def analyze(
     df.to_csv(csv_path, index=False)
     console.print(f"  Examples saved to {csv_path}")
     
-    # Summary JSON (Simple Top 5 for now)
+    # Summary JSON (ranked by composite score)
     summary = {
         "target": address,
         "total_txs": len(txs),
         "total_volume_eth": sum(t.get_value_human() for t in txs),
-        "top_nodes": [n for n in G.nodes if G.degree(n) > 5]
+        "top_nodes": top_nodes
     }
     json_path = f"{output_dir}/summary_{address}.json"
     with open(json_path, 'w') as f:
@@ -86,7 +101,7 @@ def analyze(
     
     # HTML Report
     viz_path = f"{output_dir}/report_{address}.html"
-    viz = HTMLReportGenerator(G)
+    viz = HTMLReportGenerator(G.to_networkx())
     viz.generate(viz_path)
     
     console.print(f"[bold blue]Done! Open {viz_path} to view the graph.[/bold blue]")
@@ -107,5 +122,96 @@ def fetch(
     txs = collector.fetch_transactions(address)
     print(f"Fetched {len(txs)} transactions for {address}")
 
+@app.command()
+def watch(
+    watchlist: str = typer.Option(..., help="JSON file: list of {name, address, chain}"),
+    min_interval: float = typer.Option(30.0, help="Fastest poll interval per address (seconds)"),
+    max_interval: float = typer.Option(900.0, help="Slowest poll interval per address (seconds)"),
+    output_dir: str = typer.Option("data/outputs", help="Directory for alerts.jsonl and refreshed reports"),
+    labels_dir: str = typer.Option("data/labels", "--labels", envvar="CHAINTRACE_LABELS", help="Known-entity label index (see `labels`)")
+):
+    """
+    Continuously monitor watchlist addresses and alert when patterns fire.
+    """
+    from .collectors.bitcoin import BitcoinCollector
+    from .collectors.base import BaseCollector
+
+    entries = load_watchlist(watchlist)
+    collectors: Dict[str, BaseCollector] = {}
+    for chain in {e.get("chain", "ethereum").lower() for e in entries}:
+        if chain == "bitcoin":
+            collectors[chain] = BitcoinCollector()
+        else:
+            api_key = os.getenv("ETHERSCAN_API_KEY")
+            if not api_key:
+                console.print("[bold red]ERROR: ETHERSCAN_API_KEY not found in .env[/bold red]")
+                raise typer.Exit(code=1)
+            collectors[chain] = EtherscanCollector(api_key=api_key, chain=chain)
+
+    labels = LabelIndex.load(labels_dir) if LabelIndex.exists(labels_dir) else None
+
+    def on_alert(alert):
+        console.print(f"[bold red]ALERT[/bold red] {alert['target']}: {alert['node']} -> {alert['tag']}")
+
+    watcher = Watcher(
+        entries, collectors, labels=labels, output_dir=output_dir,
+        min_interval=min_interval, max_interval=max_interval, on_alert=on_alert
+    )
+    console.print(f"[bold green]Watching {len(entries)} addresses (Ctrl+C to stop)[/bold green]")
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        console.print("[yellow]Stopped.[/yellow]")
+
+@app.command()
+def serve(
+    host: str = typer.Option("127.0.0.1", help="Interface to bind"),
+    port: int = typer.Option(8765, help="Port to listen on"),
+    max_graphs: int = typer.Option(8, help="Case graphs kept in memory (LRU)"),
+    labels_dir: str = typer.Option("data/labels", "--labels", envvar="CHAINTRACE_LABELS", help="Known-entity label index (see `labels`)")
+):
+    """
+    Serve HTTP/JSON graph queries from an in-memory graph cache.
+    """
+    from .server import GraphCache, GraphService, default_loader, make_server
+
+    labels = LabelIndex.load(labels_dir) if LabelIndex.exists(labels_dir) else None
+    service = GraphService(GraphCache(default_loader(labels), max_graphs=max_graphs))
+    server = make_server(service, host, port)
+    console.print(f"[bold green]Serving on http://{host}:{port}[/bold green] "
+                  "(/graph, /neighbourhood, /subgraph, /path, /window, /report)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        console.print("[yellow]Stopped.[/yellow]")
+    finally:
+        server.server_close()
+
+@app.command()
+def retry(
+    chain: str = typer.Option("ethereum", help="Blockchain network whose retry queue to replay"),
+):
+    """
+    Replay Etherscan requests that failed after all retries in earlier runs.
+    """
+    api_key = os.getenv("ETHERSCAN_API_KEY")
+    if not api_key:
+        console.print("[bold red]ERROR: ETHERSCAN_API_KEY not found in .env[/bold red]")
+        raise typer.Exit(code=1)
+    collector = EtherscanCollector(api_key=api_key, chain=chain)
+    remaining = collector.retry_pending()
+    console.print(f"[bold blue]Retry queue replayed; {remaining} request(s) still pending.[/bold blue]")
+
+@app.command("labels")
+def build_labels(
+    source: List[str] = typer.Option(..., help="CSV file(s) with address,name,category columns"),
+    output_dir: str = typer.Option("data/labels", help="Directory for the label index")
+):
+    """
+    Build the known-entity label index from address-label datasets.
+    """
+    index = LabelIndex.build_from_csv(source, output_dir)
+    console.print(f"[bold blue]Indexed {len(index)} addresses ({index.num_labels} distinct labels) into {output_dir}[/bold blue]")
+
 if __name__ == "__main__":
     app()
@@ -0,0 +1,276 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+import networkx as nx
+import numpy as np
+from .analysis.heuristics import tag_nodes
+from .analysis.ranking import rank_nodes
+from .collectors.base import BaseCollector
+from .collectors.cache import SingleFlight
+from .graph.builder import GraphBuilder
+from .graph.compact import CompactGraph, to_micros
+from .labels.index import LabelIndex
+from .tracer import trace
+from .visualize.report import HTMLReportGenerator
+
+CaseKey = Tuple[str, str, int]  # (chain, address, depth)
+GraphLoader = Callable[[str, str, int], CompactGraph]
+
+DEFAULT_MAX_GRAPHS = 8
+MAX_HOPS = 3
+
+
+class QueryError(Exception):
+    """Bad or unanswerable query; carries the HTTP status to return."""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+def build_case(collector: BaseCollector, address: str, depth: int, labels: Optional[LabelIndex] = None) -> CompactGraph:
+    """
+    Collect, build, tag and rank one case graph. Raises a 503 QueryError if any
+    fetch failed, so a truncated graph is never cached or served as complete.
+    """
+    txs = trace(collector, address, depth=depth, labels=labels)
+    if collector.incomplete:
+        missing = ", ".join(sorted(collector.incomplete))
+        raise QueryError(f"Trace incomplete, could not fetch: {missing}; retry later", status=503)
+    G = GraphBuilder(txs).build_compact()
+    tag_nodes(G, labels=labels)
+    rank_nodes(G)
+    return G
+
+
+def default_loader(labels: Optional[LabelIndex] = None) -> GraphLoader:
+    """Build case graphs with the normal analyze pipeline (collect, build, tag, rank)."""
+    from .collectors.bitcoin import BitcoinCollector
+    from .collectors.etherscan import EtherscanCollector
+
+    def load(chain: str, address: str, depth: int) -> CompactGraph:
+        collector: BaseCollector
+        if chain == "bitcoin":
+            collector = BitcoinCollector()
+        else:
+            api_key = os.getenv("ETHERSCAN_API_KEY")
+            if not api_key:
+                raise QueryError("ETHERSCAN_API_KEY not configured", status=503)
+            collector = EtherscanCollector(api_key=api_key, chain=chain)
+
+        return build_case(collector, address, depth, labels)
+
+    return load
+
+
+class GraphCache:
+    """
+    LRU cache of built case graphs (compact form). Concurrent misses for the
+    same case share one build.
+    """
+
+    def __init__(self, loader: GraphLoader, max_graphs: int = DEFAULT_MAX_GRAPHS):
+        self.loader = loader
+        self.max_graphs = max_graphs
+        self._graphs: "OrderedDict[CaseKey, CompactGraph]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._builds = SingleFlight()
+
+    def get(self, chain: str, address: str, depth: int) -> CompactGraph:
+        key: CaseKey = (chain.lower(), address.lower(), depth)
+        with self._lock:
+            if key in self._graphs:
+                self._graphs.move_to_end(key)
+                return self._graphs[key]
+
+        G = self._builds.do("|".join(map(str, key)), lambda: self.loader(chain.lower(), address, depth))
+
+        with self._lock:
+            self._graphs[key] = G
+            self._graphs.move_to_end(key)
+            while len(self._graphs) > self.max_graphs:
+                self._graphs.popitem(last=False)
+        return G
+
+    def __len__(self) -> int:
+        return len(self._graphs)
+
+
+def graph_payload(G: nx.DiGraph) -> Dict[str, Any]:
+    """JSON-ready nodes/edges for a (sub)graph."""
+    return {
+        "nodes": [{"id": n, **attrs} for n, attrs in G.nodes(data=True)],
+        "edges": [{"source": u, "target": v, **attrs} for u, v, attrs in G.edges(data=True)],
+    }
+
+
+class GraphService:
+    """
+    Query operations over cached case graphs (transport-independent).
+    Traversals run on the compact arrays; only the (small) result is
+    materialised as a networkx graph for the response or report.
+    """
+
+    def __init__(self, cache: GraphCache):
+        self.cache = cache
+
+    def _require(self, G: CompactGraph, node: str) -> int:
+        node = node.lower()
+        if node not in G:
+            raise QueryError(f"Node {node} not in graph", status=404)
+        return G.index[node]
+
+    def _direction(self, direction: str) -> str:
+        if direction not in ("in", "out", "both"):
+            raise QueryError("direction must be one of: in, out, both")
+        return direction
+
+    def summary(self, G: CompactGraph, top: int = 25) -> Dict[str, Any]:
+        score = G.metrics.get("score", np.zeros(G.number_of_nodes()))
+        ranked = np.argsort(-score, kind="stable")[:top]
+        return {
+            "nodes": G.number_of_nodes(),
+            "edges": G.number_of_edges(),
+            "top_nodes": [{"id": G.nodes[i], **G.node_data(int(i))} for i in ranked],
+        }
+
+    def neighbourhood(self, G: CompactGraph, node: str, hops: int = 1, direction: str = "both") -> nx.DiGraph:
+        start = self._require(G, node)
+        if not 1 <= hops <= MAX_HOPS:
+            raise QueryError(f"hops must be between 1 and {MAX_HOPS}")
+        direction = self._direction(direction)
+
+        reached = np.zeros(G.number_of_nodes(), dtype=bool)
+        reached[start] = True
+        frontier = np.array([start], dtype=np.int64)
+        for _ in range(hops):
+            _, v = G.expand(frontier, direction)
+            frontier = np.unique(v[~reached[v]])
+            if not frontier.size:
+                break
+            reached[frontier] = True
+        return G.subgraph(np.flatnonzero(reached))
+
+    def subgraph(self, G: CompactGraph, nodes: Iterable[str]) -> nx.DiGraph:
+        return G.subgraph([G.index[n.lower()] for n in nodes if n.lower() in G])
+
+    def path(self, G: CompactGraph, source: str, target: str, directed: bool = True) -> nx.DiGraph:
+        s, t = self._require(G, source), self._require(G, target)
+        parent = np.full(G.number_of_nodes(), -1, dtype=np.int64)
+        parent[s] = s
+        frontier = np.array([s], dtype=np.int64)
+        while frontier.size and parent[t] < 0:
+            u, v = G.expand(frontier, "out" if directed else "both")
+            new = parent[v] < 0
+            v, first = np.unique(v[new], return_index=True)
+            parent[v] = u[new][first]
+            frontier = v
+        if parent[t] < 0:
+            raise QueryError(f"No path from {source.lower()} to {target.lower()}", status=404)
+
+        nodes = [t]
+        while nodes[-1] != s:
+            nodes.append(int(parent[nodes[-1]]))
+        nodes.reverse()
+        edges: List[int] = []
+        for a, b in zip(nodes, nodes[1:]):
+            i = G.edge_index(a, b)
+            if i is None:
+                i = G.edge_index(b, a)  # Undirected path walked an edge backwards
+            if i is not None:
+                edges.append(i)
+        return G.to_networkx(edges, nodes)
+
+    def _parse_time(self, text: str) -> int:
+        """
+        Parse an ISO bound to edge-time microseconds. Edge timestamps are naive
+        local time (as produced by the collectors), so aware bounds (offset or Z)
+        are converted to that.
+        """
+        if text[-1:] in ("Z", "z"):
+            text = text[:-1] + "+00:00"  # fromisoformat only accepts Z from Python 3.11
+        try:
+            dt = datetime.fromisoformat(text)
+        except ValueError as e:
+            raise QueryError(f"Invalid timestamp: {e}")
+        if dt.tzinfo is not None:
+            dt = dt.astimezone().replace(tzinfo=None)
+        return to_micros(dt)
+
+    def window(self, G: CompactGraph, start: Optional[str], end: Optional[str]) -> nx.DiGraph:
+        """Edges active at any point in [start, end] (ISO timestamps, either may be open)."""
+        active = np.ones(G.number_of_edges(), dtype=bool)
+        if end:
+            active &= G.first_seen <= self._parse_time(end)
+        if start:
+            active &= G.last_seen >= self._parse_time(start)
+        return G.to_networkx(np.flatnonzero(active))
+
+    def query(self, route: str, params: Dict[str, str]) -> Tuple[str, Any]:
+        """Dispatch a route; returns (content_type, body)."""
+        address = params.get("address")
+        if not address:
+            raise QueryError("address is required")
+        try:
+            depth = int(params.get("depth", "1"))
+            hops = int(params.get("hops", "1"))
+        except ValueError:
+            raise QueryError("depth and hops must be integers")
+        G = self.cache.get(params.get("chain", "ethereum"), address, depth)
+
+        H: nx.DiGraph
+        if route == "/graph":
+            return "application/json", self.summary(G)
+        elif route == "/neighbourhood":
+            H = self.neighbourhood(G, params.get("node", address), hops, params.get("direction", "both"))
+        elif route == "/subgraph":
+            H = self.subgraph(G, params.get("nodes", "").split(","))
+        elif route == "/path":
+            if "source" not in params or "target" not in params:
+                raise QueryError("source and target are required")
+            H = self.path(G, params["source"], params["target"], params.get("directed", "1") != "0")
+        elif route == "/window":
+            H = self.window(G, params.get("start"), params.get("end"))
+        elif route == "/report":
+            # Report for a neighbourhood (default) or an explicit node list
+            if "nodes" in params:
+                H = self.subgraph(G, params["nodes"].split(","))
+            else:
+                H = self.neighbourhood(G, params.get("node", address), hops, params.get("direction", "both"))
+            return "text/html", HTMLReportGenerator(H).render()
+        else:
+            raise QueryError(f"Unknown route {route}", status=404)
+
+        return "application/json", graph_payload(H)
+
+
+def make_server(service: GraphService, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            try:
+                content_type, body = service.query(url.path.rstrip("/") or "/", params)
+                status = 200
+            except QueryError as e:
+                content_type, body, status = "application/json", {"error": str(e)}, e.status
+            except Exception as e:
+                content_type, body, status = "application/json", {"error": f"Internal error: {e}"}, 500
+
+            payload = body.encode() if isinstance(body, str) else json.dumps(body, default=str).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
+
@@ -0,0 +1,59 @@
+from typing import List, Optional, Set
+from .collectors.base import BaseCollector
+from .labels.index import LabelIndex
+from .models import Transaction
+
+# Categories of known entities that terminate tracing. Their counterparties are
+# customers of the service, not part of the traced flow, and fetching them
+# would spend API calls on huge, irrelevant histories.
+STOP_CATEGORIES = frozenset({"exchange"})
+
+# Placeholder senders/recipients emitted by collectors (lower-cased by the model)
+PSEUDO_ADDRESSES = {"coinbase", "unknown"}
+
+
+def trace(
+    collector: BaseCollector,
+    address: str,
+    depth: int = 1,
+    labels: Optional[LabelIndex] = None,
+    max_addresses: int = 100,
+) -> List[Transaction]:
+    """
+    Breadth-first multi-hop fetch starting at `address`.
+
+    Each hop fetches the counterparties discovered in the previous hop. Known
+    exchanges (per the label index) are kept in the graph but never expanded.
+    `max_addresses` bounds the total number of fetches.
+    """
+    txs: List[Transaction] = []
+    seen_tx: Set[tuple] = set()
+    visited: Set[str] = set()
+    frontier = [address]
+
+    for _ in range(max(depth, 1)):
+        next_frontier: List[str] = []
+        for addr in frontier:
+            if addr.lower() in visited or len(visited) >= max_addresses:
+                continue
+            visited.add(addr.lower())
+
+            for tx in collector.fetch_transactions(addr):
+                key = (tx.tx_hash, tx.from_address, tx.to_address, tx.value_wei)
+                if key in seen_tx:
+                    continue
+                seen_tx.add(key)
+                txs.append(tx)
+
+                for peer in (tx.from_address, tx.to_address):
+                    if not peer or peer in visited or peer in PSEUDO_ADDRESSES:
+                        continue
+                    if labels is not None and labels.is_category(peer, STOP_CATEGORIES):
+                        continue
+                    next_frontier.append(peer)
+
+        frontier = list(dict.fromkeys(next_frontier))
+        if not frontier:
+            break
+
+    return txs
@@ -1,18 +1,38 @@
 import networkx as nx
 from pyvis.network import Network # type: ignore
 from pathlib import Path
+from ..graph.compact import edge_label
+
+# Node size range (pixels) when nodes carry a ranking 'score'
+MIN_NODE_SIZE = 10
+MAX_NODE_SIZE = 40
 
 class HTMLReportGenerator:
     def __init__(self, G: nx.DiGraph):
         self.G = G
 
-    def generate(self, output_path: str, title: str = "Transaction Graph"):
-        """
-        Generate interactive HTML graph.
-        """
+    def _apply_sizing(self):
+        """Size nodes by their ranking score (see analysis.ranking)."""
+        for _, attrs in self.G.nodes(data=True):
+            score = attrs.get("score")
+            if score is not None and "size" not in attrs:
+                attrs["size"] = MIN_NODE_SIZE + (MAX_NODE_SIZE - MIN_NODE_SIZE) * score
+
+    def _apply_edge_labels(self):
+        """Format edge label/title strings (kept out of the graph until render time)."""
+        symbol = self.G.graph.get("symbol", "ETH")
+        for _, _, attrs in self.G.edges(data=True):
+            if "label" not in attrs and "value_human" in attrs:
+                attrs["label"], attrs["title"] = edge_label(attrs["value_human"], attrs.get("count", 1), symbol)
+
+    def _build_network(self, cdn_resources: str = "local") -> Network:
         # Configure PyVis
-        net = Network(height="100vh", width="100%", bgcolor="#222222", font_color="white", notebook=False)
+        net = Network(height="100vh", width="100%", bgcolor="#222222", font_color="white", notebook=False,
+                      cdn_resources=cdn_resources)
         
+        self._apply_sizing()
+        self._apply_edge_labels()
+
         # Convert NetworkX to PyVis
         # Note: PyVis handles this, but we want to ensure attributes are strings/numbers for JS
         net.from_nx(self.G)
@@ -41,6 +61,20 @@ class HTMLReportGenerator:
         }
         """)
         # net.show_buttons(filter_=['physics']) # Use custom options instead of default buttons
+        return net
+
+    def render(self) -> str:
+        """
+        Return the interactive HTML as a string (vis.js loaded from CDN).
+        Used to serve reports on demand without touching disk.
+        """
+        return self._build_network(cdn_resources="remote").generate_html()
+
+    def generate(self, output_path: str, title: str = "Transaction Graph"):
+        """
+        Generate interactive HTML graph.
+        """
+        net = self._build_network()
         
         # Save
         path = Path(output_path)
@@ -0,0 +1,184 @@
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+from .analysis.heuristics import tag_nodes
+from .collectors.base import BaseCollector
+from .graph.builder import GraphBuilder
+from .labels.index import LabelIndex
+from .models import Transaction
+from .visualize.report import HTMLReportGenerator
+
+DEFAULT_MIN_INTERVAL = 30.0    # Seconds between polls of an active address
+DEFAULT_MAX_INTERVAL = 900.0   # Back-off ceiling for a quiet address
+BACKOFF_FACTOR = 1.5
+
+
+@dataclass
+class WatchTarget:
+    """Polling state for one watchlist address."""
+    name: str
+    address: str
+    chain: str
+    interval: float = DEFAULT_MIN_INTERVAL
+    next_poll: float = 0.0
+    start_block: int = 0
+    baseline: bool = False
+    seen: Dict[tuple, int] = field(default_factory=dict)  # transfer key -> block, pruned below start_block
+    builder: GraphBuilder = field(default_factory=lambda: GraphBuilder([]))
+
+
+def load_watchlist(path: str) -> List[Dict[str, str]]:
+    """Read a JSON list of {"name", "address", "chain"} entries."""
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+class Watcher:
+    """
+    Incremental monitor for a watchlist.
+
+    Each poll fetches only new transfers (from the last seen block for
+    Etherscan, new txids for mempool.space), merges them into the target's
+    in-memory graph, re-tags the touched nodes and emits an alert for every
+    tag that appears or changes. Poll intervals adapt per address: halved
+    when new activity is seen, backed off when quiet.
+    """
+
+    def __init__(
+        self,
+        entries: List[Dict[str, str]],
+        collectors: Dict[str, BaseCollector],
+        labels: Optional[LabelIndex] = None,
+        output_dir: str = "data/outputs",
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        max_interval: float = DEFAULT_MAX_INTERVAL,
+        on_alert: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        self.collectors = collectors
+        self.labels = labels
+        self.output_dir = output_dir
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.on_alert = on_alert
+        self.targets = [
+            WatchTarget(name=e.get("name", e["address"]), address=e["address"], chain=e.get("chain", "ethereum").lower(), interval=min_interval)
+            for e in entries
+        ]
+        missing = {t.chain for t in self.targets} - set(collectors)
+        if missing:
+            raise ValueError(f"No collector for chain(s): {', '.join(sorted(missing))}")
+
+        # Watch mode must see fresh data: never serve polls from the disk cache
+        for collector in collectors.values():
+            collector.cache_max_age = 0
+
+    def _new_transactions(self, target: WatchTarget, txs: List[Transaction]) -> List[Transaction]:
+        fresh = []
+        for tx in txs:
+            # Unconfirmed txs (block 0) may still be replaced; they are picked up once mined.
+            # Anything below start_block was merged before its key was pruned.
+            if tx.block_number <= 0 or tx.block_number < target.start_block:
+                continue
+            key = (tx.tx_hash, tx.from_address, tx.to_address, tx.value_wei)
+            if key in target.seen:
+                continue
+            target.seen[key] = tx.block_number
+            fresh.append(tx)
+        return fresh
+
+    def _advance(self, target: WatchTarget, block: int):
+        """Move start_block forward and forget keys that can no longer be returned."""
+        if block > target.start_block:
+            target.start_block = block
+            target.seen = {k: b for k, b in target.seen.items() if b >= block}
+
+    def _emit(self, alert: Dict[str, Any]):
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(os.path.join(self.output_dir, "alerts.jsonl"), "a") as f:
+            f.write(json.dumps(alert) + "\n")
+        if self.on_alert:
+            self.on_alert(alert)
+
+    def poll_target(self, target: WatchTarget, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Fetch, merge and re-tag one target. Returns the alerts raised."""
+        now = time.time() if now is None else now
+        collector = self.collectors.get(target.chain)
+        if collector is None:
+            target.next_poll = now + self.max_interval
+            return []
+
+        # Re-query the last seen block: more txs may have landed in it
+        fresh = self._new_transactions(target, collector.fetch_transactions(target.address, start_block=target.start_block))
+        alerts: List[Dict[str, Any]] = []
+
+        if fresh:
+            self._advance(target, max(tx.block_number for tx in fresh))
+            G = target.builder.core
+            touched = target.builder.update(fresh)
+            before = {n: G.node(n).get("tag") for n in touched}
+            tag_nodes(G, labels=self.labels, nodes=touched)
+
+            if target.baseline:
+                for node in sorted(touched):
+                    tag = G.node(node).get("tag")
+                    if tag and tag != before.get(node):
+                        alerts.append({
+                            "time": datetime.fromtimestamp(now, timezone.utc).isoformat(),
+                            "target": target.name,
+                            "address": target.address,
+                            "chain": target.chain,
+                            "node": node,
+                            "tag": tag,
+                            "previous_tag": before.get(node),
+                            "new_transfers": len(fresh),
+                        })
+
+            target.interval = max(self.min_interval, target.interval / 2)
+        else:
+            target.interval = min(self.max_interval, target.interval * BACKOFF_FACTOR)
+
+        write_report = bool(alerts) or (bool(fresh) and not target.baseline)
+        target.baseline = True
+        target.next_poll = now + target.interval
+        # Alerts go out before the (slower, fallible) report write
+        for alert in alerts:
+            self._emit(alert)
+        if write_report:
+            self._write_report(target)
+        return alerts
+
+    def _write_report(self, target: WatchTarget):
+        path = os.path.join(self.output_dir, f"report_{target.address}.html")
+        HTMLReportGenerator(target.builder.core.to_networkx()).generate(path, title=target.name)
+
+    def poll_once(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Poll every target that is due, batched by chain. Returns all alerts."""
+        now = time.time() if now is None else now
+        due = [t for t in self.targets if t.next_poll <= now]
+        due.sort(key=lambda t: t.chain)  # Consecutive calls share each collector's rate limiter
+
+        alerts: List[Dict[str, Any]] = []
+        for target in due:
+            try:
+                alerts.extend(self.poll_target(target, now))
+            except Exception as e:
+                # One failing target (API, disk, bad data) must not stop the watchlist
+                print(f"ERROR: Polling {target.name} ({target.address}) failed: {e}")
+                target.interval = min(self.max_interval, target.interval * BACKOFF_FACTOR)
+                target.next_poll = now + target.interval
+        return alerts
+
+    def run(self, iterations: Optional[int] = None):
+        """Poll forever (or `iterations` cycles), sleeping until the next target is due."""
+        cycle = 0
+        while iterations is None or cycle < iterations:
+            self.poll_once()
+            cycle += 1
+            if not self.targets:
+                break
+            wait = min(t.next_poll for t in self.targets) - time.time()
+            if wait > 0 and (iterations is None or cycle < iterations):
+                time.sleep(wait)
@@ -1,15 +1,21 @@
+import json
 import os
 import sys
 from typing import List, Dict
 from chaintrace.collectors.etherscan import EtherscanCollector
 from chaintrace.collectors.bitcoin import BitcoinCollector
 from chaintrace.graph.builder import GraphBuilder
+from chaintrace.graph.diff import GraphSnapshot, diff_snapshots, is_empty
 from chaintrace.analysis.heuristics import tag_nodes
+from chaintrace.analysis.ranking import rank_nodes
 from chaintrace.visualize.report import HTMLReportGenerator
+from chaintrace.labels.index import LabelIndex
 
 # Directories
 OUTPUT_DIR = "docs" # GitHub Pages publishes from docs/ or gh-pages branch. docs/ is easier for main branch.
 DATA_DIR = "data/outputs"
+LABELS_DIR = os.getenv("CHAINTRACE_LABELS", "data/labels")
+SNAPSHOT_DIR = os.path.join(OUTPUT_DIR, "snapshots")  # Published with the dashboard so the next run can diff
 
 # Target List
 TARGETS = [
@@ -28,6 +34,8 @@ def main():
     if not etherscan_key:
         print("WARNING: ETHERSCAN_API_KEY not found. Skipping ETH targets.")
 
+    labels = LabelIndex.load(LABELS_DIR) if LabelIndex.exists(LABELS_DIR) else None
+
     # We will generate individual reports and a main index.html
     reports = []
 
@@ -55,37 +63,59 @@ def main():
             
             # 3. Build Graph
             builder = GraphBuilder(txs)
-            G = builder.build()
-            tag_nodes(G)
+            G = builder.build_compact()
+            tag_nodes(G, labels=labels)
+            rank_nodes(G)
             
-            # 4. Generate Report
+            # 4. Diff against the previous run
             # Clean filename
             safe_name = t['name'].lower().replace(" ", "_").replace("(", "").replace(")", "")
             filename = f"report_{safe_name}.html"
             filepath = os.path.join(OUTPUT_DIR, filename)
-            
-            viz = HTMLReportGenerator(G)
-            viz.generate(filepath)
+            snapshot_path = os.path.join(SNAPSHOT_DIR, f"{safe_name}.json")
+
+            snapshot = GraphSnapshot.from_graph(G)
+            changes = diff_snapshots(GraphSnapshot.load(snapshot_path), snapshot)
+
+            # 5. Generate Report (only for entities that changed)
+            if is_empty(changes) and os.path.exists(filepath):
+                print(f"No changes for {t['name']}, keeping {filepath}")
+            else:
+                viz = HTMLReportGenerator(G.to_networkx())
+                viz.generate(filepath)
+                snapshot.save(snapshot_path)
+                with open(os.path.join(OUTPUT_DIR, f"changes_{safe_name}.json"), "w") as f:
+                    json.dump(changes, f, indent=2)
+                print(f"Generated {filepath}")
             
             reports.append({
                 "name": t['name'],
                 "chain": t['chain'],
                 "address": t['address'],
                 "file": filename,
-                "nodes": len(G.nodes),
-                "edges": len(G.edges)
+                "nodes": G.number_of_nodes(),
+                "edges": G.number_of_edges(),
+                "changes": summarize_changes(changes)
             })
-            print(f"Generated {filepath}")
 
         except Exception as e:
             print(f"Error processing {t['name']}: {e}")
 
-    # 5. Generate Index Page (Dashboard)
+    # 6. Generate Index Page (Dashboard)
     index_path = os.path.join(OUTPUT_DIR, "index.html")
     with open(index_path, "w") as f:
         f.write(generate_index_html(reports))
     print(f"Dashboard updated at {index_path}")
 
+def summarize_changes(changes: Dict[str, List]) -> str:
+    """One-line change summary for the dashboard table."""
+    parts = []
+    for key, label in [("added_nodes", "new counterparties"), ("added_edges", "new flows"),
+                       ("large_flows", "large flows"), ("tag_transitions", "tag changes")]:
+        if changes[key]:
+            parts.append(f"+{len(changes[key])} {label}")
+    return ", ".join(parts) or "No change"
+
 def generate_index_html(reports: List[Dict]) -> str:
     rows = ""
     for r in reports:
@@ -95,6 +125,7 @@ def generate_index_html(reports: List[Dict]) -> str:
             <td><span class="badge {r['chain']}">{r['chain'].upper()}</span></td>
             <td><code>{r['address'][:10]}...</code></td>
             <td>{r['nodes']} / {r['edges']}</td>
+            <td>{r['changes']}</td>
             <td><a href="{r['file']}" class="btn">View Graph</a></td>
         </tr>
         """
@@ -131,6 +162,7 @@ def generate_index_html(reports: List[Dict]) -> str:
                     <th>Network</th>
                     <th>Address</th>
                     <th>Graph Size (N/E)</th>
+                    <th>Since Last Run</th>
                     <th>Action</th>
                 </tr>
             </thead>
@@ -0,0 +1,13 @@
+from datetime import datetime
+from chaintrace.models import Transaction
+
+def make_tx(i, src, dst, value_wei=10**18, day=1, **fields):
+    """
+    Transaction `i` from `src` to `dst`, stamped at midnight on 2024-01-`day`.
+    Any other Transaction field (timestamp, is_error, ...) can be overridden.
+    """
+    fields.setdefault("timestamp", datetime(2024, 1, day))
+    return Transaction(
+        chain="eth", tx_hash=str(i), block_number=i,
+        from_address=src, to_address=dst, value_wei=value_wei, **fields
+    )
@@ -0,0 +1,96 @@
+import os
+import threading
+import time
+from chaintrace.collectors.base import BaseCollector
+from chaintrace.collectors.cache import DiskCache, SingleFlight
+
+def test_roundtrip_compressed(tmp_path):
+    cache = DiskCache(tmp_path)
+    data = [{"hash": "0x1", "value": "0"}] * 100
+    cache.put("eth_a", data)
+
+    files = os.listdir(tmp_path)
+    assert files == ["eth_a.json.gz"]
+    assert cache.get("eth_a", max_age_seconds=60) == data
+    assert cache.get("eth_missing", max_age_seconds=60) is None
+
+def test_negative_entry_expires(tmp_path):
+    cache = DiskCache(tmp_path, negative_ttl=60)
+    cache.put("eth_empty", [], negative=True)
+    assert cache.get("eth_empty", max_age_seconds=86400) == []
+
+    # Age the entry past the negative TTL (but within the positive max age)
+    path = tmp_path / "eth_empty.neg.json.gz"
+    old = time.time() - 120
+    os.utime(path, (old, old))
+    assert cache.get("eth_empty", max_age_seconds=86400) is None
+
+    # A positive write replaces the negative entry
+    cache.put("eth_empty", [1])
+    assert not path.exists()
+
+def test_lru_eviction(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=12_000)
+    blob = os.urandom(3000).hex()  # incompressible
+    for i in range(3):
+        cache.put(f"k{i}", blob)
+        past = time.time() - 100 + i
+        os.utime(tmp_path / f"k{i}.json.gz", (past, past))
+
+    # Touch k0 so k1 becomes least recently used
+    assert cache.get("k0", max_age_seconds=3600) == blob
+    cache.put("k3", blob)
+
+    assert cache.get("k1", max_age_seconds=3600) is None
+    assert cache.get("k0", max_age_seconds=3600) == blob
+    assert cache.get("k3", max_age_seconds=3600) == blob
+
+def test_size_counts_replaced_entries(tmp_path):
+    cache = DiskCache(tmp_path)
+    cache.put("k", [1])
+    for _ in range(20):
+        cache.put("k", list(range(100)))  # TTL refresh of the same key
+    cache.put("k", [], negative=True)     # Replaces the positive entry
+
+    assert cache._size == cache._scan_size()
+
+def test_single_flight_coalesces():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def upstream():
+        calls.append(1)
+        release.wait(1)
+        return "result"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("k", upstream))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == ["result"] * 5
+
+class CountingCollector(BaseCollector):
+    def fetch_transactions(self, address, start_block=0):
+        return []
+
+def test_late_miss_rereads_cache(tmp_path):
+    collector = CountingCollector("eth", str(tmp_path))
+    calls = []
+
+    def upstream():
+        calls.append(1)
+        collector._write_cache("0xa", [{"hash": "0x1"}])
+        return [{"hash": "0x1"}]
+
+    assert collector._read_cache("0xa") is None
+    assert collector._fetch_through_cache("0xa", upstream) == [{"hash": "0x1"}]
+    # A caller that missed before the leader wrote still gets the cached result
+    assert collector._fetch_through_cache("0xa", upstream) == [{"hash": "0x1"}]
+    assert len(calls) == 1
@@ -0,0 +1,74 @@
+from datetime import datetime
+from chaintrace.graph.builder import GraphBuilder
+from chaintrace.graph.compact import CompactGraph, from_micros, to_micros
+from chaintrace.visualize.report import HTMLReportGenerator
+from conftest import make_tx
+
+TS = datetime(2024, 1, 1, 12, 30, 15, 123456)
+
+def test_aggregates_parallel_transfers():
+    txs = [
+        make_tx(1, "0xa", "0xb", timestamp=TS.replace(day=3)),
+        make_tx(2, "0xa", "0xb", 25 * 10**17, timestamp=TS),
+        make_tx(3, "0xb", None, 10**17, timestamp=TS),
+        make_tx(4, "0xa", "0xc", 9 * 10**18, timestamp=TS, is_error=True),
+    ]
+    G = CompactGraph.from_transactions(txs)
+    assert G.nodes == ["0xa", "0xb", "CONTRACT_CREATION"]
+    assert G.number_of_edges() == 2
+
+    attrs = G.get_edge_data("0xa", "0xb")
+    assert attrs["count"] == 2
+    assert attrs["value_human"] == 3.5
+    assert attrs["first_seen"] == "2024-01-01T12:30:15.123456"
+    assert attrs["last_seen"] == "2024-01-03T12:30:15.123456"
+    assert "label" not in attrs  # Formatted by the report at render time
+    assert not G.has_edge("0xb", "0xa")
+
+    # Typed arrays only: a few dozen bytes per edge, 8 per node for degrees
+    assert G.nbytes() <= 44 * G.number_of_edges() + 8 * G.number_of_nodes()
+
+def test_value_sums_are_exact():
+    # 10 x 0.1 ETH sums to exactly 1.0 (float accumulation gives 0.9999999999999999)
+    G = CompactGraph.from_transactions([make_tx(i, "0xa", "0xb", 10**17) for i in range(10)])
+    assert G.get_edge_data("0xa", "0xb")["value_human"] == 1.0
+
+    # Sums past 2**64 wei carry into the high limb
+    builder = GraphBuilder([make_tx(1, "0xa", "0xb", 2**64 - 1)])
+    G = builder.build_compact()
+    builder.update([make_tx(2, "0xa", "0xb", 2**64 - 1), make_tx(3, "0xa", "0xb", 5)])
+    assert G.edge_wei(G.edge_index(0, 1)) == 2 * (2**64 - 1) + 5
+
+def test_timestamps_roundtrip_exactly():
+    ts = datetime(2024, 5, 6, 7, 8, 9, 999999)
+    assert from_micros(to_micros(ts)) == ts
+
+def test_update_matches_full_build():
+    txs = [make_tx(i, f"0x{i % 5}", f"0x{(i * 3) % 7}", (i + 1) * 10**17, day=1 + i % 20) for i in range(60)]
+    full = GraphBuilder(txs).build_compact().to_networkx()
+
+    builder = GraphBuilder(txs[:25])
+    G = builder.build_compact()
+    G.in_degrees()  # Populate adjacency caches before the update
+    touched = builder.update(txs[25:])
+    assert touched
+
+    H = G.to_networkx()
+    assert set(H.edges) == set(full.edges)
+    for u, v, attrs in full.edges(data=True):
+        assert H.edges[u, v] == attrs
+    assert list(G.in_degrees()) == [full.in_degree(n) for n in G.nodes]
+    assert list(G.out_degrees()) == [full.out_degree(n) for n in G.nodes]
+
+def test_report_formats_edge_labels():
+    G = GraphBuilder([make_tx(1, "0xa", "0xb", 15 * 10**17), make_tx(2, "0xa", "0xb", 5 * 10**17)]).build_compact()
+
+    html = HTMLReportGenerator(G.to_networkx()).render()
+    assert "2.0000 ETH" in html
+    assert "Transfers: 2" in html
+
+    # The CSV export carries the same strings for Gephi/Maltego/Neo4j imports
+    row = G.to_dataframe().iloc[0]
+    assert (row["source"], row["target"]) == ("0xa", "0xb")
+    assert row["label"] == "2.0000 ETH"
+    assert row["title"] == "Transfers: 2<br>Vol: 2.0000 ETH"
@@ -0,0 +1,36 @@
+from chaintrace.graph.builder import GraphBuilder
+from chaintrace.graph.diff import GraphSnapshot, diff_snapshots, is_empty
+from conftest import make_tx
+
+def test_diff_detects_changes(tmp_path):
+    old_txs = [make_tx(1, "0xa", "0xb"), make_tx(2, "0xa", "0xc")]
+    G = GraphBuilder(old_txs).build_compact()
+    path = str(tmp_path / "snap.json")
+    GraphSnapshot.from_graph(G).save(path)
+    old = GraphSnapshot.load(path)
+
+    # Unchanged graph: identical fingerprint, empty change set
+    same = GraphSnapshot.from_graph(GraphBuilder(old_txs).build_compact())
+    assert same.fingerprint == old.fingerprint
+    assert is_empty(diff_snapshots(old, same))
+
+    # Next run: 0xc dropped out of the history, new flows arrived, 0xa got tagged
+    builder = GraphBuilder(old_txs[:1])
+    G = builder.build_compact()
+    builder.update([make_tx(3, "0xa", "0xb", 20 * 10**18), make_tx(4, "0xa", "0xd", 5 * 10**17)])
+    G.node_attrs[G.index["0xa"]] = {"tag": "Dispenser"}
+    changes = diff_snapshots(old, GraphSnapshot.from_graph(G))
+
+    assert changes["added_nodes"] == [{"node": "0xd", "tag": None}]
+    assert changes["removed_nodes"] == [{"node": "0xc", "tag": None}]
+    assert changes["tag_transitions"] == [{"node": "0xa", "from": None, "to": "Dispenser"}]
+    assert [(e["source"], e["target"]) for e in changes["added_edges"]] == [("0xa", "0xd")]
+    assert [(e["source"], e["target"]) for e in changes["removed_edges"]] == [("0xa", "0xc")]
+    assert changes["changed_edges"] == [{"source": "0xa", "target": "0xb", "count_delta": 1, "value_delta": 20.0}]
+    assert changes["large_flows"] == [{"source": "0xa", "target": "0xb", "value_delta": 20.0}]
+
+def test_first_run_is_all_added():
+    G = GraphBuilder([make_tx(1, "0xa", "0xb")]).build_compact()
+    changes = diff_snapshots(None, GraphSnapshot.from_graph(G))
+    assert len(changes["added_nodes"]) == 2
+    assert len(changes["added_edges"]) == 1
@@ -27,6 +27,7 @@ def test_graph_aggregation():
     assert edge_ab is not None
     assert edge_ab["count"] == 2
     assert edge_ab["value_human"] == 3.0 # 1 + 2
+    assert edge_ab["label"] == "3.0000 ETH"
     
     # Check Edge B->A
     edge_ba = G.get_edge_data("0xb", "0xa")
@@ -0,0 +1,70 @@
+from typing import List
+from chaintrace.graph.builder import GraphBuilder
+from chaintrace.analysis.heuristics import tag_nodes
+from chaintrace.collectors.base import BaseCollector
+from chaintrace.labels.index import LabelIndex
+from chaintrace.tracer import trace
+from conftest import make_tx
+
+ROWS = [
+    ("0xHOT", "Binance 14", "exchange"),
+    ("0xmix", "Tornado Cash", "mixer"),
+    ("0xmix", "Tornado Cash Router", "mixer"),  # later row wins
+]
+
+def test_label_index_roundtrip(tmp_path):
+    LabelIndex.build(ROWS, str(tmp_path))
+    assert LabelIndex.exists(str(tmp_path))
+
+    index = LabelIndex.load(str(tmp_path))
+    assert len(index) == 2
+    assert index.lookup("0xhot") == {"name": "Binance 14", "category": "exchange"}
+    assert index.lookup("0xMIX")["name"] == "Tornado Cash Router"
+    assert index.lookup("0xunknown") is None
+
+def test_tag_nodes_with_labels(tmp_path):
+    index = LabelIndex.build(ROWS, str(tmp_path))
+    G = GraphBuilder([make_tx(1, "0xa", "0xhot")]).build_compact()
+    tag_nodes(G, labels=index)
+
+    assert G.node("0xhot")["tag"] == "Exchange"
+    assert G.node("0xhot")["label"] == "Binance 14"
+    assert "tag" not in G.node("0xa")
+
+class FakeCollector(BaseCollector):
+    def __init__(self, history, cache_dir):
+        super().__init__("eth", cache_dir)
+        self.history = history
+        self.calls: List[str] = []
+
+    def fetch_transactions(self, address, start_block=0):
+        self.calls.append(address)
+        return self.history.get(address, [])
+
+def test_trace_stops_at_exchange(tmp_path):
+    index = LabelIndex.build(ROWS, str(tmp_path / "labels"))
+    history = {
+        "0xa": [make_tx(1, "0xa", "0xb"), make_tx(2, "0xa", "0xhot")],
+        "0xb": [make_tx(1, "0xa", "0xb"), make_tx(3, "0xb", "0xc")],
+    }
+    collector = FakeCollector(history, str(tmp_path / "cache"))
+
+    txs = trace(collector, "0xa", depth=2, labels=index)
+
+    assert collector.calls == ["0xa", "0xb"]
+    assert len(txs) == 3
+
+def test_label_index_names_and_categories(tmp_path):
+    index = LabelIndex.build(ROWS + [("0xcafe", "Café Exchange ☕", "Exchange")], str(tmp_path))
+    index = LabelIndex.load(str(tmp_path))
+
+    assert index.lookup("0xcafe") == {"name": "Café Exchange ☕", "category": "exchange"}
+    assert index.category("0xmix") == "mixer"
+    assert index.category("0xunknown") is None
+    assert index.is_category("0xcafe", frozenset({"exchange"}))
+    assert not index.is_category("0xmix", frozenset({"exchange"}))
+
+def test_empty_label_index(tmp_path):
+    index = LabelIndex.build([], str(tmp_path))
+    assert len(index) == 0
+    assert index.lookup("0xhot") is None
@@ -0,0 +1,19 @@
+from chaintrace.collectors.etherscan import normalize_chunk
+
+def _rows(n):
+    rows = [{
+        "hash": f"0x{i}", "timeStamp": str(1700000000 + i), "blockNumber": str(i),
+        "from": "0xAA", "to": "0xbb" if i % 3 else "", "value": str(i),
+        "gasUsed": "21000", "gasPrice": "1", "isError": "0",
+    } for i in range(n)]
+    rows[7]["value"] = "bad"
+    rows[42]["timeStamp"] = "bad"
+    return rows
+
+def test_normalize_chunk_skips_bad_rows():
+    txs, warnings = normalize_chunk(_rows(100), "ethereum")
+    assert len(txs) == 98
+    assert [tx.tx_hash for tx in txs][:8] == [f"0x{i}" for i in (0, 1, 2, 3, 4, 5, 6, 8)]
+    assert txs[0].to_address is None and txs[1].from_address == "0xaa"
+    # One warning per skipped row, in input order
+    assert [w.split()[5].rstrip(":") for w in warnings] == ["0x7", "0x42"]
@@ -0,0 +1,25 @@
+from chaintrace.graph.builder import GraphBuilder
+from chaintrace.analysis.ranking import rank_nodes
+from conftest import make_tx
+
+def test_rank_nodes_hub_first():
+    # Many senders -> hub -> one sink
+    txs = [make_tx(i, f"0x{i}", "0xhub") for i in range(10)]
+    txs.append(make_tx(99, "0xhub", "0xsink", 10 * 10**18))
+    G = GraphBuilder(txs).build_compact()
+
+    ranked = rank_nodes(G, top_n=3)
+
+    assert len(ranked) == 3
+    assert ranked[0]["address"] == "0xhub"
+    assert ranked[0]["flow_in"] == 10.0
+    assert ranked[0]["flow_out"] == 10.0
+    assert ranked[0]["betweenness"] > 0
+    assert [r["score"] for r in ranked] == sorted((r["score"] for r in ranked), reverse=True)
+
+    # Scores are stored on every node for report sizing
+    assert all(0.0 <= G.node(n)["score"] <= 1.0 for n in G.nodes)
+
+def test_rank_nodes_empty():
+    G = GraphBuilder([]).build_compact()
+    assert rank_nodes(G) == []
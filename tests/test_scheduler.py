@@ -0,0 +1,95 @@
+import pytest
+from chaintrace.collectors.scheduler import (
+    RequestScheduler, RetryQueue, Throttled, InvalidKey, PermanentError, RetryExhausted
+)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+def _scheduler(keys, tmp_path, **kwargs):
+    clock = FakeClock()
+    sched = RequestScheduler(
+        keys, rate_per_key=4.0, queue=RetryQueue(tmp_path / "queue.json"),
+        sleep=clock.sleep, clock=clock, **kwargs
+    )
+    return sched, clock
+
+def test_keys_rotate_and_throughput_scales(tmp_path):
+    sched, clock = _scheduler(["k1", "k2"], tmp_path)
+    used = [sched.run(lambda key: key) for _ in range(8)]
+
+    assert used.count("k1") == 4 and used.count("k2") == 4
+    # 8 calls at 4/sec on each of 2 keys take ~1s, not ~2s
+    assert clock.now < 1.0
+
+def test_throttle_backs_off_and_retries(tmp_path):
+    sched, clock = _scheduler(["k1"], tmp_path)
+    responses = iter([Throttled("Max rate limit reached"), "ok"])
+
+    def request(key):
+        r = next(responses)
+        if isinstance(r, Exception):
+            raise r
+        return r
+
+    assert sched.run(request) == "ok"
+    assert sched.rates["k1"] == pytest.approx(4.0 / 2 + 0.1)
+    assert clock.now >= 1.0  # Throttled key rested before retrying
+
+def test_invalid_key_removed_from_pool(tmp_path):
+    sched, _ = _scheduler(["bad", "good"], tmp_path)
+
+    def request(key):
+        if key == "bad":
+            raise InvalidKey("Invalid API Key")
+        return key
+
+    assert [sched.run(request) for _ in range(3)] == ["good"] * 3
+    assert sched.keys == ["good"]
+
+def test_exhausted_job_is_queued(tmp_path):
+    sched, _ = _scheduler(["k1"], tmp_path, max_retries=2)
+    job = {"address": "0xa", "start_block": 0}
+
+    def failing(key):
+        raise Throttled("Max rate limit reached")
+
+    with pytest.raises(RetryExhausted):
+        sched.run(failing, job=job)
+    assert RetryQueue(tmp_path / "queue.json").pending() == [job]
+
+    # A later successful run removes it
+    sched.run(lambda key: "ok", job=job)
+    assert RetryQueue(tmp_path / "queue.json").pending() == []
+
+def test_exhausted_pool_still_queues(tmp_path):
+    sched, _ = _scheduler(["bad"], tmp_path)
+
+    def request(key):
+        raise InvalidKey("Invalid API Key")
+
+    jobs = [{"address": "0xa", "start_block": 0}, {"address": "0xb", "start_block": 0}]
+    for job in jobs:
+        with pytest.raises(RetryExhausted):
+            sched.run(request, job=job)
+    assert RetryQueue(tmp_path / "queue.json").pending() == jobs
+
+def test_permanent_error_not_retried(tmp_path):
+    sched, _ = _scheduler(["k1"], tmp_path)
+    calls = []
+
+    def request(key):
+        calls.append(key)
+        raise PermanentError("Invalid address format")
+
+    with pytest.raises(PermanentError):
+        sched.run(request, job={"address": "0xbad", "start_block": 0})
+    assert len(calls) == 1
+    assert RetryQueue(tmp_path / "queue.json").pending() == []
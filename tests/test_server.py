@@ -0,0 +1,105 @@
+import json
+import threading
+from datetime import datetime
+from urllib.request import urlopen
+import pytest
+from chaintrace.graph.builder import GraphBuilder
+from chaintrace.collectors.base import BaseCollector
+from chaintrace.server import GraphCache, GraphService, QueryError, build_case, make_server
+from conftest import make_tx
+
+# a -> b -> c -> d, plus e -> a
+TXS = [make_tx(1, "0xa", "0xb", day=1), make_tx(2, "0xb", "0xc", day=2), make_tx(3, "0xc", "0xd", day=3), make_tx(4, "0xe", "0xa", day=4)]
+
+class CountingLoader:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, chain, address, depth):
+        self.calls += 1
+        return GraphBuilder(TXS).build_compact()
+
+def test_graph_cache_lru():
+    loader = CountingLoader()
+    cache = GraphCache(loader, max_graphs=2)
+
+    G = cache.get("ethereum", "0xA", 1)
+    assert cache.get("ethereum", "0xa", 1) is G
+    cache.get("ethereum", "0xb", 1)
+    cache.get("ethereum", "0xa", 1)  # refresh 0xa
+    cache.get("ethereum", "0xc", 1)  # evicts 0xb
+
+    assert loader.calls == 3
+    assert len(cache) == 2
+    cache.get("ethereum", "0xb", 1)
+    assert loader.calls == 4
+
+def test_service_queries():
+    service = GraphService(GraphCache(CountingLoader()))
+    base = {"address": "0xa"}
+
+    _, body = service.query("/neighbourhood", {**base, "node": "0xb", "hops": "1"})
+    assert {n["id"] for n in body["nodes"]} == {"0xa", "0xb", "0xc"}
+
+    _, body = service.query("/neighbourhood", {**base, "hops": "2", "direction": "out"})
+    assert {n["id"] for n in body["nodes"]} == {"0xa", "0xb", "0xc"}
+
+    _, body = service.query("/path", {**base, "source": "0xe", "target": "0xd"})
+    assert [(e["source"], e["target"]) for e in body["edges"]] == [("0xe", "0xa"), ("0xa", "0xb"), ("0xb", "0xc"), ("0xc", "0xd")]
+
+    _, body = service.query("/window", {**base, "start": "2024-01-02", "end": "2024-01-03"})
+    assert len(body["edges"]) == 2
+
+    # Aware bounds (offset or Z) are compared in the edges' local time
+    start, end = datetime(2024, 1, 2).astimezone(), datetime(2024, 1, 3).astimezone()
+    _, body = service.query("/window", {**base, "start": start.isoformat(), "end": end.isoformat()})
+    assert len(body["edges"]) == 2
+    _, body = service.query("/window", {**base, "start": "2024-01-03T00:00:00Z"})
+    assert body["edges"]
+
+    with pytest.raises(QueryError) as err:
+        service.query("/window", {**base, "start": "yesterday"})
+    assert err.value.status == 400
+
+    with pytest.raises(QueryError) as err:
+        service.query("/path", {**base, "source": "0xd", "target": "0xa"})
+    assert err.value.status == 404
+
+def test_http_roundtrip():
+    server = make_server(GraphService(GraphCache(CountingLoader())), port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    try:
+        with urlopen(f"{url}/subgraph?address=0xa&nodes=0xa,0xb") as resp:
+            body = json.load(resp)
+        assert len(body["edges"]) == 1
+
+        with urlopen(f"{url}/report?address=0xa&node=0xa") as resp:
+            assert resp.headers["Content-Type"] == "text/html"
+            assert b"vis-network" in resp.read()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+class PartialCollector(BaseCollector):
+    def __init__(self, cache_dir, failing):
+        super().__init__("ethereum", cache_dir)
+        self.failing = failing
+
+    def fetch_transactions(self, address, start_block=0):
+        if address in self.failing:
+            self.incomplete.add(address)
+            return []
+        return [tx for tx in TXS if address in (tx.from_address, tx.to_address)]
+
+def test_incomplete_trace_not_cached(tmp_path):
+    collector = PartialCollector(str(tmp_path), failing={"0xb"})
+    cache = GraphCache(lambda chain, address, depth: build_case(collector, address, depth))
+
+    with pytest.raises(QueryError) as err:
+        cache.get("ethereum", "0xa", 2)
+    assert err.value.status == 503
+    assert len(cache) == 0
+
+    collector.failing, collector.incomplete = set(), set()
+    assert cache.get("ethereum", "0xa", 2).number_of_edges() == 3
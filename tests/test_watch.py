@@ -0,0 +1,102 @@
+import json
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+from chaintrace.collectors.base import BaseCollector
+from chaintrace.collectors.etherscan import EtherscanCollector
+from chaintrace.watch import Watcher
+
+TARGET = "0xaaaa"
+
+def _raw_tx(i, src, dst, block):
+    return {
+        "hash": f"0x{i}", "blockNumber": str(block), "timeStamp": str(1700000000 + i),
+        "from": src, "to": dst, "value": str(10**18), "gasUsed": "21000",
+        "gasPrice": "1", "isError": "0",
+    }
+
+class MockEtherscan(BaseHTTPRequestHandler):
+    txs: list = []
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        start = int(query["startblock"][0])
+        result = [t for t in self.txs if int(t["blockNumber"]) >= start]
+        body = {"status": "1", "message": "OK", "result": result} if result else \
+            {"status": "0", "message": "No transactions found", "result": []}
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+def test_watch_incremental_alerts(tmp_path):
+    server = HTTPServer(("127.0.0.1", 0), MockEtherscan)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        MockEtherscan.txs = [_raw_tx(i, TARGET, f"0x{i:04d}", 100) for i in range(5)]
+        collector = EtherscanCollector(
+            api_key="test", cache_dir=str(tmp_path / "cache"),
+            base_url=f"http://127.0.0.1:{server.server_port}/api", rate_per_key=1000
+        )
+        watcher = Watcher(
+            [{"name": "Target", "address": TARGET, "chain": "ethereum"}],
+            {"ethereum": collector}, output_dir=str(tmp_path / "out"),
+            min_interval=10, max_interval=100
+        )
+        target = watcher.targets[0]
+
+        # Baseline poll: builds the graph, no alerts
+        assert watcher.poll_once(now=0) == []
+        assert target.builder.core.number_of_edges() == 5
+        assert (tmp_path / "out" / f"report_{TARGET}.html").exists()
+
+        # Quiet poll backs off
+        assert watcher.poll_once(now=target.next_poll) == []
+        assert target.interval == 15
+
+        # Sixth counterparty turns the target into a Dispenser
+        MockEtherscan.txs.append(_raw_tx(5, TARGET, "0x0005", 101))
+        alerts = watcher.poll_once(now=target.next_poll)
+
+        assert [(a["node"], a["tag"]) for a in alerts] == [(TARGET, "Dispenser")]
+        assert target.interval == 10
+        assert target.start_block == 101
+        assert len(target.seen) == 1  # Keys below the start block are dropped
+        assert target.builder.core.number_of_edges() == 6
+        lines = (tmp_path / "out" / "alerts.jsonl").read_text().splitlines()
+        assert json.loads(lines[0])["tag"] == "Dispenser"
+    finally:
+        server.shutdown()
+
+def test_watch_normalises_chain(tmp_path):
+    collector = EtherscanCollector(api_key="test", cache_dir=str(tmp_path / "cache"))
+    watcher = Watcher([{"address": TARGET, "chain": "Ethereum"}], {"ethereum": collector})
+    assert watcher.targets[0].chain == "ethereum"
+
+    with pytest.raises(ValueError, match="bitcoin"):
+        Watcher([{"address": TARGET, "chain": "Bitcoin"}], {"ethereum": collector})
+
+class FlakyCollector(BaseCollector):
+    def __init__(self, cache_dir):
+        super().__init__("ethereum", cache_dir)
+
+    def fetch_transactions(self, address, start_block=0):
+        if address == "0xbroken":
+            raise OSError("disk full")
+        return []
+
+def test_watch_survives_failing_target(tmp_path):
+    watcher = Watcher(
+        [{"address": "0xbroken"}, {"address": "0xok"}],
+        {"ethereum": FlakyCollector(str(tmp_path))}, min_interval=10, max_interval=100
+    )
+    broken, ok = watcher.targets
+
+    assert watcher.poll_once(now=0) == []
+    assert broken.next_poll == 15  # Backed off, not retried in a tight loop
+    assert ok.next_poll == 15 and ok.baseline